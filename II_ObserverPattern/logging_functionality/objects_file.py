@@ -6,7 +6,7 @@ logger = logging.getLogger(__name__)
 
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     name : str = 'John'
     surname : str = 'Doe'
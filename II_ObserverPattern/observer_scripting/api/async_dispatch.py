@@ -0,0 +1,103 @@
+# Asynchronous dispatcher for the event system.
+# post_event only puts the event in a (bounded) queue, and an asyncio loop,
+# running in its own thread, delivers it to the subscribers. This way a slow
+# listener no longer adds up to the time spent registering a user.
+import asyncio
+import atexit
+import threading
+import traceback
+from collections import deque
+
+
+class AsyncDispatcher:
+    """Delivers events in a background asyncio loop. Subscribers may be plain
+    functions or coroutine functions
+
+    Args:
+        maxsize (int): max number of pending events. When full, enqueue blocks (backpressure)
+        timeout (float): max time enqueue waits for room (None -> forever)
+        max_errors (int): failed deliveries kept in .errors (the most recent ones)
+    """
+
+    def __init__(self, maxsize: int = 10_000, timeout=None, max_errors: int = 1_000) -> None:
+        self.timeout = timeout
+        self.errors = deque(maxlen=max_errors)  # (function, data, exception) of the failed deliveries
+        # The room left in the queue is tracked from the caller's side, so a post
+        # does not need a round trip to the loop thread
+        self._room = threading.BoundedSemaphore(maxsize)
+        self._loop = asyncio.new_event_loop()
+        self._queue = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='event-dispatcher', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        self._closed = False
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._worker_task = self._loop.create_task(self._worker())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            handlers, data, has_room = await queue.get()
+            try:
+                for fn in handlers:
+                    try:
+                        result = fn(data)
+                        if asyncio.iscoroutine(result):
+                            await result
+                    except Exception as e:
+                        self.errors.append((fn, data, e))
+                        traceback.print_exception(e)
+            finally:
+                queue.task_done()
+                if has_room:
+                    self._room.release()
+
+    async def _shutdown(self) -> None:
+        self._worker_task.cancel()
+        try:
+            await self._worker_task
+        except asyncio.CancelledError:
+            pass
+        self._loop.stop()
+
+    def enqueue(self, handlers, data) -> None:
+        """Queues the data for the given subscribers and returns straight away
+        (unless the queue is full, in which case it waits for room)"""
+        if self._closed:
+            raise Exception('The dispatcher has been closed')
+        if threading.current_thread() is self._thread:
+            # Posted by a subscriber: waiting for room would block the only thread that
+            # makes room, so it goes in straight away, over maxsize
+            self._queue.put_nowait((handlers, data, False))
+            return
+        if not self._room.acquire(timeout=self.timeout):
+            raise Exception('Event queue is full')
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (handlers, data, True))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def drain(self, timeout=None) -> None:
+        """Blocks until every queued event has been delivered"""
+        if threading.current_thread() is self._thread:
+            raise Exception('drain can not be called from a subscriber')
+        asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop).result(timeout)
+
+    def close(self, timeout=None) -> None:
+        """Flushes the queue and stops the loop. Registered at exit as well,
+        so no event is lost when the app finishes"""
+        if self._closed:
+            return
+        self._closed = True
+        self.drain(timeout)
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
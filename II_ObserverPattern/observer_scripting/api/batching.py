@@ -0,0 +1,127 @@
+# Batched events. When importing users in bulk, calling every subscriber once per
+# user is mostly overhead. Subscribers registered with batch=True get a list of
+# events instead, and post_events/EventBatcher group the events for them.
+import threading
+import time
+from itertools import islice
+
+from .executors import is_future
+
+
+class BatchSubscriber:
+    """Wraps a subscriber that expects a list of events. Posting a single
+    event (post_event) still works: it gets a list of one element"""
+    __slots__ = ('function', '__name__')
+
+    def __init__(self, function) -> None:
+        self.function = function
+        self.__name__ = getattr(function, '__name__', repr(function))
+
+    def __call__(self, data):
+        return self.function([data])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BatchSubscriber):
+            return self.function == other.function
+        return self.function == other
+
+    def __hash__(self) -> int:
+        return hash(self.function)
+
+
+def chunked(iterable, size: int):
+    """Splits any iterable in lists of (at most) size elements, without materializing it"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def deliver_batch(handlers, batch: list) -> list:
+    """Delivers a list of events: batch subscribers get it in one call, the rest once per event.
+    Returns the Futures of the subscribers running in a pool"""
+    futures = []
+    for fn in handlers:
+        if isinstance(fn, BatchSubscriber):
+            result = fn.function(batch)
+            if is_future(result):
+                futures.append(result)
+        else:
+            for data in batch:
+                result = fn(data)
+                if is_future(result):
+                    futures.append(result)
+    return futures
+
+
+class EventBatcher:
+    """Accumulates events posted one by one and hands them over to post_events
+    every batch_size events, or after flush_interval seconds, whatever comes first
+
+    Args:
+        event_type (str): key for the events
+        batch_size (int): max number of events per batch
+        flush_interval (float): max seconds an event waits in the batcher (None -> no timer)
+    """
+
+    def __init__(self, event_type: str, batch_size: int = 1_000, flush_interval=1.0) -> None:
+        self.event_type = event_type
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._futures = []  # of the batches delivered since the last flush
+        self._pending = []
+        self._lock = threading.Lock()
+        # Batches are taken and delivered under this one, so they arrive in order
+        # whoever delivers them (the timer or a post). Reentrant: a subscriber may post again
+        self._delivery = threading.RLock()
+        self._stop = threading.Event()
+        self._last_flush = time.monotonic()
+        self._timer = None
+        if flush_interval is not None:
+            self._timer = threading.Thread(target=self._tick, name='event-batcher', daemon=True)
+            self._timer.start()
+
+    def _tick(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def post(self, data) -> None:
+        with self._lock:
+            self._pending.append(data)
+            if len(self._pending) < self.batch_size:
+                return
+        self._deliver_pending()
+
+    def flush(self) -> list:
+        """Delivers whatever is waiting in the batcher. Returns the futures (subscribers
+        running in a pool) of every batch delivered since the last flush, the ones of
+        the timer included (with flush_interval=None, only the caller flushes)"""
+        with self._delivery:
+            self._deliver_pending()
+            futures, self._futures = self._futures, []
+        return futures
+
+    def _deliver_pending(self) -> None:
+        from .events import post_events
+        with self._delivery:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if batch:
+                self._last_flush = time.monotonic()
+                self._futures.extend(post_events(self.event_type, batch, batch_size=len(batch)))
+
+    def close(self) -> list:
+        """Stops the timer and delivers what is left. Returns the futures, as flush"""
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,44 +1,90 @@
-<<<<<<< HEAD:II_ObserverPattern/events.py
-from typing import Callable
+from collections.abc import Callable
+
+from .batching import BatchSubscriber, chunked, deliver_batch
+from .executors import INLINE, ExecutorSubscriber, is_future
+from .lazy import LazySubscriber
+from .registry import SubscriberRegistry, Subscription
 #from dataclasses import field
 
-#subscribers:dict = field(default_factory=dict)
-subscribers = dict()
+registry = SubscriberRegistry()
+# event type -> tuple of subscribers. Read only: it is rebuilt by the registry on every change
+subscribers = registry.snapshots
+# topic -> tuple of every subscriber (wildcards included). Filled on demand by the registry
+_resolved = registry.resolved
+
+# When set (see enable_journal), every posted event is stored before being dispatched
+journal = None
+
+# When set (see enable_instrumentation), post_event times every subscriber
+instrumentation = None
+
+# When set (see enable_async_dispatch), post_event just hands the event over
+# to the dispatcher and returns, instead of calling the subscribers inline
+dispatcher = None
 
-def subscribe(event_type: str,function:Callable):
+# When set (see enable_transport), posted events also go to the other processes
+# connected to the same broker, and theirs come to the subscribers of this one
+transport = None
+
+def subscribe(event_type: str,function:Callable | str,executor:str = INLINE,batch:bool = False):
     """Function in charge of adding subscribers to the event
 
     Args:
-        event_type (str): key for the event
-        function (Callable): function called uppon being notified
-    """
-=======
-subscribers = dict()
+        event_type (str): key for the event. It may be a pattern, with '*' for one
+            word and '#' for any number of words ('user.*', 'user.#' ...)
+        function (Callable | str): function called uppon being notified. It can also be
+            given by name, 'module:function', and then its module is only imported
+            when the first event arrives (see api.lazy)
+        executor (str): where the function runs: 'inline' (in post_event),
+            'thread' or 'process' (in a pool, post_event returns a Future for it)
+        batch (bool): the function expects a list of events (see post_events)
 
-def subscribe(event_type: str,function):
->>>>>>> a3bc63310f26b8918d48398f3a50b0fc0ca332ab:II_ObserverPattern/observer_scripting/api/events.py
-    if not event_type in subscribers:
-        # This is done to avoid the overwriting of existing 
-        # subscribers
-        subscribers[event_type] = []
-    subscribers[event_type].append(function)
+    Returns:
+        Subscription: handle to remove just this subscriber (subscription.unsubscribe())
+    """
+    if isinstance(function, str):
+        function = LazySubscriber(function)
+    if executor != INLINE:
+        function = ExecutorSubscriber(function,executor)
+    if batch:
+        function = BatchSubscriber(function)
+    subscription = registry.add(event_type,function)
+    if transport is not None:
+        transport.subscribe(event_type)
+    return subscription
 
-<<<<<<< HEAD:II_ObserverPattern/events.py
-# This event system, as it is right now, would allow several 
-# functions to be called for a given event identifier (str). 
-# In a way, this would make it difficult to remove events.
+# This event system allows several functions to be called for a given
+# event identifier (str). Each one can be removed through its Subscription,
+# or all of them at once with unsubscribe.
 
 
-def unsubscribe(event_type: str):
+def unsubscribe(event_type: str, function:Callable = None):
     """Function to unsubscribe events from the system
 
     Args:
         event_type (str): key to identify the events to be removed
+        function (Callable | str): remove only this subscriber (or 'module:function')
+            instead of all of them
     """
-    try:
-        subscribers.pop(event_type)
-    except KeyError as e:
-        print(e)
+    if function is not None:
+        removed = registry.remove_function(event_type,function)
+    else:
+        removed = registry.remove_event(event_type)
+    if not removed:
+        print(KeyError(event_type))
+    _unsubscribe_transport()
+
+
+def clear_subscribers():
+    """Removes every subscriber of every event"""
+    registry.clear()
+    _unsubscribe_transport()
+
+
+def _unsubscribe_transport():
+    """Stops the events of the other processes that no subscriber of this one wants anymore"""
+    if transport is not None:
+        transport.unsubscribe_unused(lambda event_type: event_type in registry.snapshots)
 
 
 def post_event(event_type:str,data):
@@ -47,19 +93,188 @@ def post_event(event_type:str,data):
     Args:
         event_type (str): key for the event
         data (_type_): Data passed to the funcions stored under each key
-    """     
-=======
-def post_event(event_type:str,data):
->>>>>>> a3bc63310f26b8918d48398f3a50b0fc0ca332ab:II_ObserverPattern/observer_scripting/api/events.py
-    if not event_type in subscribers:
-        # In case of not having the event_type provided 
+
+    Returns:
+        list: Futures of the subscribers running in a thread/process pool
+        (see api.executors.collect_errors)
+    """
+    futures = []
+    if journal is not None:
+        journal.append(event_type,data)
+    if transport is not None:
+        transport.publish(event_type,data)
+    handlers = _resolved.get(event_type)
+    if handlers is None:
+        handlers = registry.resolve(event_type)
+    if not handlers:
+        # In case of not having the event_type provided
         # in the list of events (dictionay ... whatever)
-        return
-    for fn in subscribers[event_type]:
-        fn(data)
+        return futures
+    if dispatcher is not None:
+        dispatcher.enqueue(handlers,data)
+        return futures
+    if instrumentation is not None:
+        return instrumentation.dispatch(event_type,handlers,data)
+    for fn in handlers:
+        result = fn(data)
+        if is_future(result):
+            futures.append(result)
+    return futures
+
+
+def post_events(event_type:str,iterable,batch_size:int = 1_000):
+    """Function that posts many events at once. Subscribers registered with
+    batch=True get one list per batch_size events, the rest are called per event
+
+    Args:
+        event_type (str): key for the event
+        iterable (Iterable): events to post (consumed lazily, batch by batch)
+        batch_size (int): max number of events handed over in a single call
+
+    Returns:
+        list: Futures of the subscribers running in a thread/process pool
+    """
+    futures = []
+    if journal is None and transport is None and not registry.get(event_type):
+        return futures
+    for batch in chunked(iterable,batch_size):
+        if journal is not None:
+            for data in batch:
+                journal.append(event_type,data)
+        if transport is not None:
+            transport.publish_many(event_type,batch)
+        futures.extend(_dispatch_batch(event_type,batch))
+    return futures
+
+
+def _dispatch_batch(event_type:str,batch:list) -> list:
+    """Hands a list of events over to the local subscribers (of post_events and of
+    the events coming from other processes, see enable_transport)"""
+    handlers = registry.get(event_type)
+    if not handlers:
+        # Subscriptions removed through their handle are noticed here, on their next event
+        _unsubscribe_transport()
+        return []
+    if dispatcher is not None:
+        batch_handlers = [fn.function for fn in handlers if isinstance(fn,BatchSubscriber)]
+        if batch_handlers:
+            dispatcher.enqueue(batch_handlers,batch)
+        single_handlers = [fn for fn in handlers if not isinstance(fn,BatchSubscriber)]
+        if single_handlers:
+            for data in batch:
+                dispatcher.enqueue(single_handlers,data)
+        return []
+    if instrumentation is not None:
+        return instrumentation.dispatch_batch(event_type,handlers,batch)
+    return deliver_batch(handlers,batch)
+
+
+def enable_journal(directory: str, **kwargs):
+    """Stores every posted event in an append only journal (api.journal.EventJournal),
+    so it survives a crash and can be replayed. The data has to be picklable
+
+    Args:
+        directory (str): folder of the journal segments
+        kwargs: segment_bytes, fsync ('always', 'batch', 'never') and fsync_interval
+    """
+    global journal
+    from .journal import EventJournal
+    if journal is None:
+        journal = EventJournal(directory, **kwargs)
+    return journal
+
+
+def disable_journal():
+    """Syncs and closes the journal"""
+    global journal
+    if journal is not None:
+        journal.close()
+        journal = None
+
+
+def replay(function:Callable, from_offset:int = 0, event_type:str = None) -> int:
+    """Calls function(data) for every journaled event (of event_type, if given), so a new
+    subscriber can catch up with the history. Returns the offset to continue from"""
+    if journal is None:
+        raise Exception('There is no journal to replay from, see enable_journal')
+    return journal.replay(function, from_offset=from_offset, event_type=event_type)
+
+
+def enable_instrumentation():
+    """Starts recording calls, latencies and errors of every subscriber
+    (only for the synchronous dispatch). Returns the DispatchStats, see its
+    snapshot, to_prometheus and dump methods"""
+    global instrumentation
+    from .instrumentation import DispatchStats
+    if instrumentation is None:
+        instrumentation = DispatchStats()
+    return instrumentation
+
+
+def disable_instrumentation():
+    """Stops recording. Returns the stats collected so far (None if it was not enabled)"""
+    global instrumentation
+    stats, instrumentation = instrumentation, None
+    return stats
+
+
+def enable_async_dispatch(maxsize: int = 10_000, timeout=None):
+    """Switches post_event to the asynchronous mode: events are queued and the
+    subscribers (plain functions or coroutines) run in a background event loop
+
+    Args:
+        maxsize (int): max number of queued events before post_event blocks (backpressure)
+        timeout (float): max time post_event waits for room in the queue (None -> forever)
+    """
+    global dispatcher
+    from .async_dispatch import AsyncDispatcher
+    if dispatcher is None:
+        dispatcher = AsyncDispatcher(maxsize=maxsize, timeout=timeout)
+    return dispatcher
+
+
+def disable_async_dispatch():
+    """Drains the pending events and goes back to the synchronous mode"""
+    global dispatcher
+    if dispatcher is not None:
+        dispatcher.close()
+        dispatcher = None
+
+
+def enable_transport(path: str, **kwargs):
+    """Connects this process to the event broker listening at path (see api.transport),
+    so every process gets the events posted in the others. Events from the other
+    processes are delivered from a background thread. The data of the events has
+    to be a lib.database.User or picklable
+
+    Args:
+        path (str): Unix socket of the broker (api.transport.start_broker)
+        kwargs: batch_size and flush_interval of the outgoing events
+    """
+    global transport
+    from .transport import Transport
+    if transport is None:
+        transport = Transport(path, deliver=_dispatch_batch, **kwargs)
+        for event_type in list(registry.snapshots):
+            transport.subscribe(event_type)
+    return transport
+
+
+def disable_transport():
+    """Sends the pending events and disconnects from the broker"""
+    global transport
+    if transport is not None:
+        transport.close()
+        transport = None
+
+
+def drain(timeout=None):
+    """Waits until every queued event has been delivered (no-op in synchronous mode)"""
+    if dispatcher is not None:
+        dispatcher.drain(timeout)
 
 
 # This it the event manage system ...
 
-# Notice that this would be doing the job of the subject. It bassically can subscribe observers (add) 
-# and posts events to them, in case that the state has changed.
\ No newline at end of file
+# Notice that this would be doing the job of the subject. It bassically can subscribe observers (add)
+# and posts events to them, in case that the state has changed.
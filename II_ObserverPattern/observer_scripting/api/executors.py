@@ -0,0 +1,89 @@
+# Executors for subscribers doing heavy work (hashing, enrichment ...).
+# Instead of running in the loop of post_event, one after the other, a subscriber
+# can be sent to a thread pool (good for I/O and for code releasing the GIL) or
+# to a process pool (pure python CPU work). post_event then gets a Future back.
+# concurrent.futures is imported on first use only: it brings logging and
+# multiprocessing with it, which is most of the start up time of the app.
+import atexit
+
+INLINE = 'inline'
+THREAD = 'thread'
+PROCESS = 'process'
+
+_max_workers = {THREAD: None, PROCESS: None}
+_pools = dict()
+
+
+def configure_executors(thread_workers=None, process_workers=None) -> None:
+    """Sets the number of workers of the pools (None -> default of concurrent.futures).
+    Pools already running are shut down, so the new size is used from now on"""
+    shutdown_executors()
+    _max_workers[THREAD] = thread_workers
+    _max_workers[PROCESS] = process_workers
+
+
+def get_executor(kind: str):
+    """Returns the shared pool for the given kind ('thread' or 'process'), creating it if needed"""
+    try:
+        return _pools[kind]
+    except KeyError:
+        if kind not in _max_workers:
+            raise Exception(f"Unknown executor {kind}, use one of {INLINE}, {THREAD} or {PROCESS}")
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        pool_type = ThreadPoolExecutor if kind == THREAD else ProcessPoolExecutor
+        pool = _pools[kind] = pool_type(max_workers=_max_workers[kind])
+        return pool
+
+
+def is_future(result) -> bool:
+    """isinstance(result, Future), but concurrent.futures is only imported once a
+    subscriber gives something back (plain subscribers return None)"""
+    if result is None:
+        return False
+    from concurrent.futures import Future
+    return isinstance(result, Future)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Waits for the running subscribers and stops the pools"""
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown(wait=wait)
+
+atexit.register(shutdown_executors)
+
+
+class ExecutorSubscriber:
+    """Wraps a subscriber so calling it submits the work to a pool and returns a Future.
+    For the process pool, both the function and the data have to be picklable"""
+    __slots__ = ('function', 'kind', '__name__')
+
+    def __init__(self, function, kind: str) -> None:
+        # Checked now, not on every post_event
+        if kind not in _max_workers:
+            raise Exception(f"Unknown executor {kind}, use one of {INLINE}, {THREAD} or {PROCESS}")
+        self.function = function
+        self.kind = kind
+        self.__name__ = getattr(function, '__name__', repr(function))
+
+    def __call__(self, data) -> 'Future':
+        return get_executor(self.kind).submit(self.function, data)
+
+    def __eq__(self, other) -> bool:
+        # So a subscriber can be found by its plain function as well
+        if isinstance(other, ExecutorSubscriber):
+            return self.function == other.function and self.kind == other.kind
+        return self.function == other
+
+    def __hash__(self) -> int:
+        return hash(self.function)
+
+
+def collect_errors(futures: list, timeout=None) -> list:
+    """Waits for the futures returned by post_event and returns the exceptions raised
+    by the subscribers (an empty list when everything went fine)"""
+    from concurrent.futures import wait as wait_futures
+    done, not_done = wait_futures(futures, timeout=timeout)
+    errors = [f.exception() for f in done if f.exception() is not None]
+    errors.extend(TimeoutError('Subscriber did not finish in time') for _ in not_done)
+    return errors
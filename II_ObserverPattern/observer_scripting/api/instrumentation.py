@@ -0,0 +1,213 @@
+# Instrumentation of the event dispatch: how many times every subscriber is called,
+# how long it takes (total, max and a histogram for the percentiles) and how many
+# times it fails. It is off by default, and then post_event only pays for a
+# single "is None" check (see events.enable_instrumentation).
+import json
+import threading
+import time
+
+from .batching import BatchSubscriber
+from .executors import is_future
+
+# Latencies go into power of two buckets (in ns): bucket b holds the values < 2**b
+N_BUCKETS = 48
+
+
+class LatencyStats:
+    __slots__ = ('name', 'calls', 'errors', 'total_ns', 'max_ns', 'buckets', '_lock')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * N_BUCKETS
+        self._lock = threading.Lock()  # events may be posted from several threads at once
+
+    def record(self, elapsed_ns: int, failed: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.total_ns += elapsed_ns
+            if elapsed_ns > self.max_ns:
+                self.max_ns = elapsed_ns
+            self.buckets[min(elapsed_ns.bit_length(), N_BUCKETS - 1)] += 1
+            if failed:
+                self.errors += 1
+
+    def percentile(self, q: float) -> int:
+        """Upper bound (in ns) of the bucket holding the q-th percentile (q in [0, 100])"""
+        if not self.calls:
+            return 0
+        target = self.calls * q / 100
+        count = 0
+        for b, n in enumerate(self.buckets):
+            count += n
+            if count >= target:
+                return min(1 << b, self.max_ns)
+        return self.max_ns
+
+    def as_dict(self) -> dict:
+        with self._lock:  # a consistent view, even while events are posted
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'total_s': self.total_ns / 1e9,
+                'mean_s': self.total_ns / self.calls / 1e9 if self.calls else 0.0,
+                'max_s': self.max_ns / 1e9,
+                'p50_s': self.percentile(50) / 1e9,
+                'p90_s': self.percentile(90) / 1e9,
+                'p99_s': self.percentile(99) / 1e9,
+            }
+
+
+def subscriber_name(fn) -> str:
+    function = fn
+    while hasattr(function, 'function'):  # Executor/Batch/Lazy wrappers
+        if hasattr(function, 'target'):
+            # Lazy subscriber: named by its target, imported or not yet
+            return function.target.replace(':', '.')
+        function = function.function
+    module = getattr(function, '__module__', None) or ''
+    name = getattr(function, '__qualname__', None) or getattr(function, '__name__', None) \
+        or type(function).__name__
+    return f'{module}.{name}' if module else name
+
+
+class DispatchStats:
+    """Collected stats, per event type and per (event type, subscriber)"""
+
+    def __init__(self) -> None:
+        self.events = dict()        # event type -> LatencyStats of the whole post
+        self.subscribers = dict()   # (event type, id(fn)) -> LatencyStats
+        # The subscribers of those stats. Holding them keeps their id from being reused
+        # by a new subscriber (which would inherit the stats) once they are unsubscribed
+        self._functions = dict()    # (event type, id(fn)) -> fn
+        self._lock = threading.Lock()
+
+    def _event(self, event_type: str) -> LatencyStats:
+        stats = self.events.get(event_type)
+        if stats is None:
+            with self._lock:
+                stats = self.events.setdefault(event_type, LatencyStats(event_type))
+        return stats
+
+    def _subscriber(self, event_type: str, fn) -> LatencyStats:
+        key = (event_type, id(fn))
+        stats = self.subscribers.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self.subscribers.setdefault(key, LatencyStats(subscriber_name(fn)))
+                self._functions[key] = fn
+        return stats
+
+    def dispatch(self, event_type: str, handlers, data) -> list:
+        """Timed version of the post_event loop"""
+        futures = []
+        clock = time.perf_counter_ns
+        start = clock()
+        failed = False
+        try:
+            for fn in handlers:
+                t0 = clock()
+                try:
+                    result = fn(data)
+                except Exception:
+                    failed = True
+                    self._subscriber(event_type, fn).record(clock() - t0, failed=True)
+                    raise
+                self._subscriber(event_type, fn).record(clock() - t0)
+                if is_future(result):
+                    futures.append(result)
+        finally:
+            self._event(event_type).record(clock() - start, failed)
+        return futures
+
+    def dispatch_batch(self, event_type: str, handlers, batch: list) -> list:
+        """Timed version of batching.deliver_batch (one record per subscriber and batch)"""
+        futures = []
+        clock = time.perf_counter_ns
+        start = clock()
+        failed = False
+        try:
+            for fn in handlers:
+                t0 = clock()
+                try:
+                    if isinstance(fn, BatchSubscriber):
+                        results = [fn.function(batch)]
+                    else:
+                        results = [fn(data) for data in batch]
+                except Exception:
+                    failed = True
+                    self._subscriber(event_type, fn).record(clock() - t0, failed=True)
+                    raise
+                self._subscriber(event_type, fn).record(clock() - t0)
+                futures.extend(r for r in results if is_future(r))
+        finally:
+            self._event(event_type).record(clock() - start, failed)
+        return futures
+
+    def reset(self) -> None:
+        with self._lock:
+            self.events.clear()
+            self.subscribers.clear()
+            self._functions.clear()
+
+    # --- Export ---
+    def snapshot(self) -> dict:
+        """Plain dict with every stat, ready for json"""
+        subscribers = dict()
+        for (event_type, _), stats in list(self.subscribers.items()):
+            by_name = subscribers.setdefault(event_type, {})
+            name = stats.name
+            while name in by_name:  # Two subscribers with the same name (lambdas ...)
+                name += "'"
+            by_name[name] = stats.as_dict()
+        return {
+            'events': {event_type: stats.as_dict() for event_type, stats in list(self.events.items())},
+            'subscribers': subscribers,
+        }
+
+    def to_prometheus(self, prefix: str = 'observer') -> str:
+        """Stats in the Prometheus text exposition format"""
+        lines = []
+
+        def histogram(metric: str, labels: str, stats: LatencyStats) -> None:
+            count = 0
+            for b, n in enumerate(stats.buckets):
+                count += n
+                if n:
+                    lines.append(f'{metric}_bucket{{{labels},le="{(1 << b) / 1e9:.9g}"}} {count}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {stats.calls}')
+            lines.append(f'{metric}_sum{{{labels}}} {stats.total_ns / 1e9:.9g}')
+            lines.append(f'{metric}_count{{{labels}}} {stats.calls}')
+
+        metric = f'{prefix}_event_dispatch_seconds'
+        lines.append(f'# TYPE {metric} histogram')
+        for event_type, stats in list(self.events.items()):
+            histogram(metric, f'event="{_escape(event_type)}"', stats)
+
+        subscribers = list(self.subscribers.items())
+        metric = f'{prefix}_subscriber_seconds'
+        lines.append(f'# TYPE {metric} histogram')
+        for (event_type, _), stats in subscribers:
+            histogram(metric, f'event="{_escape(event_type)}",subscriber="{_escape(stats.name)}"', stats)
+        for suffix, kind, value in (('subscriber_max_seconds', 'gauge', lambda s: f'{s.max_ns / 1e9:.9g}'),
+                                    ('subscriber_errors_total', 'counter', lambda s: s.errors)):
+            lines.append(f'# TYPE {prefix}_{suffix} {kind}')
+            for (event_type, _), stats in subscribers:
+                lines.append(f'{prefix}_{suffix}{{event="{_escape(event_type)}",'
+                             f'subscriber="{_escape(stats.name)}"}} {value(stats)}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: str) -> None:
+        """Writes the stats to a file: json if the path ends with .json, Prometheus text otherwise"""
+        with open(path, 'w') as f:
+            if path.endswith('.json'):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
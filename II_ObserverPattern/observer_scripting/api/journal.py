@@ -0,0 +1,243 @@
+# Durable, append only journal of the posted events.
+# Every event is appended to a segment file before being dispatched, so after a
+# crash the history is still there, and a new subscriber can replay it from any
+# offset (the sequence number of the event).
+#
+# On disk: a directory with segments named after the offset of their first record
+# (00000000000000000000.log, 00000000000000100000.log ...). Every record is
+#   [length: uint32][crc32: uint32][payload: pickle of (event_type, data)]
+# A torn record at the end of the last segment (crash in the middle of a write)
+# is detected by the length/crc and dropped when the journal is opened again.
+import bisect
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+HEADER = struct.Struct('<II')
+SUFFIX = '.log'
+
+# fsync policies. Every append is written to the OS before it returns, so with any
+# of them the journal survives a crash of the process; they differ on a crash of the machine
+ALWAYS = 'always'   # fsync after every append (slow, nothing is ever lost)
+BATCH = 'batch'     # group commit: one fsync every fsync_interval for all the appends in between
+NEVER = 'never'     # leave it to the OS (the data survives a crash of the process, not of the machine)
+
+
+def _segment_name(first_offset: int) -> str:
+    return f'{first_offset:020d}{SUFFIX}'
+
+
+def _scan(buffer, skip: int = 0):
+    """Yields (position, payload) of the valid records of a segment, stopping at the first torn one.
+    The first skip records are jumped over (payload None) without reading nor checking them"""
+    position = 0
+    end = len(buffer)
+    while position + HEADER.size <= end:
+        length, crc = HEADER.unpack_from(buffer, position)
+        payload_start = position + HEADER.size
+        if payload_start + length > end:
+            return
+        if skip:
+            skip -= 1
+            yield position, None
+            position = payload_start + length
+            continue
+        payload = buffer[payload_start:payload_start + length]
+        if zlib.crc32(payload) != crc:
+            return
+        yield position, payload
+        position = payload_start + length
+
+
+class EventJournal:
+    """Segmented append only log of events
+
+    Args:
+        directory (str): where the segments live (created if needed)
+        segment_bytes (int): size after which a new segment is started
+        fsync (str): 'always', 'batch' or 'never' (see the policies above)
+        fsync_interval (float): seconds between group commits with the 'batch' policy
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 << 20, fsync: str = BATCH,
+                 fsync_interval: float = 0.01) -> None:
+        if fsync not in (ALWAYS, BATCH, NEVER):
+            raise Exception(f"Unknown fsync policy {fsync}, use one of {ALWAYS}, {BATCH} or {NEVER}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        self._segments = sorted(int(name[:-len(SUFFIX)]) for name in os.listdir(directory)
+                                if name.endswith(SUFFIX))
+        self._file = None
+        self._recover()
+        self._durable_offset = self.next_offset  # everything below it has been fsynced
+        self._closed = False
+        self._syncer = None
+        if fsync == BATCH:
+            self._syncer = threading.Thread(target=self._group_commit, name='journal-fsync', daemon=True)
+            self._syncer.start()
+
+    # --- Writing ---
+    def _recover(self) -> None:
+        """Finds the next offset, dropping a torn record at the end of the last segment"""
+        if not self._segments:
+            self.next_offset = 0
+            self._open_segment(0)
+            return
+        first = self._segments[-1]
+        path = self._path(first)
+        count, valid_end = 0, 0
+        with open(path, 'rb') as f:
+            data = f.read()
+        for position, payload in _scan(data):
+            count += 1
+            valid_end = position + HEADER.size + len(payload)
+        if valid_end != len(data):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+        self.next_offset = first + count
+        self._file = open(path, 'ab')
+        self._size = valid_end
+
+    def _path(self, first_offset: int) -> str:
+        return os.path.join(self.directory, _segment_name(first_offset))
+
+    def _open_segment(self, first_offset: int) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        self._file = open(self._path(first_offset), 'ab')
+        self._size = 0
+        if not self._segments or self._segments[-1] != first_offset:
+            self._segments.append(first_offset)
+            if self.fsync != NEVER:
+                self._sync_directory()
+
+    def _sync_directory(self) -> None:
+        """fsyncs the directory, so a new segment file is still there after a power loss"""
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def append(self, event_type: str, data, wait: bool = False) -> int:
+        """Appends an event and returns its offset
+
+        Args:
+            wait (bool): with the 'batch' policy, block until the record is on disk
+        """
+        payload = pickle.dumps((event_type, data), protocol=pickle.HIGHEST_PROTOCOL)
+        record = HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if self._closed:
+                raise Exception('The journal has been closed')
+            if self._size and self._size + len(record) > self.segment_bytes:
+                self._open_segment(self.next_offset)
+            self._file.write(record)
+            # Out of the buffer of the process: from now on only a crash of the machine can lose it
+            self._file.flush()
+            self._size += len(record)
+            offset = self.next_offset
+            self.next_offset += 1
+            if self.fsync == ALWAYS:
+                self._sync_locked()
+            elif wait and self.fsync == BATCH:
+                # Wakes up the group commit, that takes every pending append with it
+                self._synced.notify_all()
+                self._synced.wait_for(lambda: self._durable_offset > offset or self._closed)
+        return offset
+
+    def _sync_locked(self) -> None:
+        self._file.flush()
+        if self.fsync != NEVER:
+            os.fsync(self._file.fileno())
+        self._durable_offset = self.next_offset
+        self._synced.notify_all()
+
+    def _group_commit(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                self._synced.wait(self.fsync_interval)
+                if self._closed or self._durable_offset == self.next_offset:
+                    continue
+                self._file.flush()
+                target = self.next_offset
+                # The fsync runs without the lock, so the appends go on meanwhile.
+                # A duplicated descriptor survives a segment switch in between
+                fd = os.dup(self._file.fileno())
+            try:
+                # One fsync for every append since the last one
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            with self._lock:
+                if target > self._durable_offset:
+                    self._durable_offset = target
+                self._synced.notify_all()
+
+    def sync(self) -> None:
+        """Flushes (and fsyncs, unless the policy is 'never') what has been appended"""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._sync_locked()
+            self._closed = True
+            self._synced.notify_all()
+            self._file.close()
+        if self._syncer is not None:
+            self._syncer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- Reading ---
+    def read(self, from_offset: int = 0):
+        """Yields (offset, event_type, data) from the given offset on. The segments are
+        memory mapped, so nothing but the current record is copied in memory"""
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+            segments = list(self._segments)
+            end_offset = self.next_offset
+        index = max(bisect.bisect_right(segments, from_offset) - 1, 0)
+        for first in segments[index:]:
+            offset = first
+            with open(self._path(first), 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    for _, payload in _scan(buffer, skip=max(from_offset - first, 0)):
+                        if offset >= end_offset:
+                            return
+                        if payload is not None:
+                            event_type, data = pickle.loads(payload)
+                            yield offset, event_type, data
+                        offset += 1
+
+    def replay(self, function, from_offset: int = 0, event_type: str = None) -> int:
+        """Calls function(data) for every stored event (of the given event_type, if any)
+        from the offset on. Returns the offset to continue from next time"""
+        next_offset = from_offset
+        for offset, stored_type, data in self.read(from_offset):
+            if event_type is None or stored_type == event_type:
+                function(data)
+            next_offset = offset + 1
+        return next_offset
@@ -0,0 +1,55 @@
+# Lazy subscribers. A listener module (and everything it imports: logging, the
+# log sink ...) is only needed once its event is posted, so a subscriber can be
+# given by name, as 'module:function', and it is imported on the first call.
+# This keeps the start up of short lived processes fast.
+import importlib
+
+
+class LazySubscriber:
+    """Stands for the function named by target ('package.module:function'),
+    which is imported the first time the subscriber is called"""
+    __slots__ = ('target', 'function', '__name__')
+
+    def __init__(self, target: str) -> None:
+        module, _, name = target.partition(':')
+        if not module or not name:
+            raise ValueError(f"Expected 'module:function', got {target!r}")
+        self.target = target
+        self.function = None
+        self.__name__ = name
+
+    def resolve(self):
+        """Imports the module (once) and returns the function"""
+        if self.function is None:
+            module, _, name = self.target.partition(':')
+            function = importlib.import_module(module)
+            for attribute in name.split('.'):
+                function = getattr(function, attribute)
+            self.function = function
+        return self.function
+
+    def __call__(self, data):
+        function = self.function
+        if function is None:
+            function = self.resolve()
+        return function(data)
+
+    def __eq__(self, other) -> bool:
+        # So a subscriber can be found by its name, or by the function itself
+        if isinstance(other, LazySubscriber):
+            return self.target == other.target
+        if isinstance(other, str):
+            return self.target == other
+        if self.function is not None:
+            return self.function == other
+        # Not imported yet: compared by name, a comparison must not import the module
+        module, qualname = getattr(other, '__module__', None), getattr(other, '__qualname__', None)
+        if module is None or qualname is None:
+            return NotImplemented
+        return self.target == f'{module}:{qualname}'
+
+    def __hash__(self) -> int:
+        return hash(self.target)
+
+    def __repr__(self) -> str:
+        return f'LazySubscriber({self.target!r})'
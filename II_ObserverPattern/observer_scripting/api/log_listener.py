@@ -1,15 +1,37 @@
 # This is the listener, the handler of events. It is the surface that 
 # contacts the changes made with the logging system
 
-from lib.log import log_stuff
+from lib.log import log_many, log_stuff
+from lib.log_pipeline import get_logger, queue_logging_running, setup_queue_logging
 from .events import subscribe
 
+logger = get_logger('user_creation')
+
 def handle_log_user_registered_event(user):
     """This function handles the user creation info to the logging system.
     It works as the middleman ..."""
     log_stuff(f"User {user.name} created, with and email {user.email}")
 
-def setup_handle_log_user_creation():
+def handle_log_users_registered_batch(users:list):
+    """Batch version of the handler: a single write for the whole list of users"""
+    log_many([f"User {user.name} created, with and email {user.email}" for user in users])
+
+def handle_logging_user_registered_event(user):
+    """Same handler, but through the logging module. The %-style arguments are
+    only formatted if the level is enabled (and then, in the QueueListener thread
+    when lib.log_pipeline.setup_queue_logging is used)"""
+    logger.info("User %s created, with and email %s", user.name, user.email)
+
+def setup_handle_log_user_creation(batch:bool = False, use_logging:bool = False):
     """This function activates (sets up) the logging system.
-    It tells the app when to log the user creation."""
-    subscribe('user_creation',handle_log_user_registered_event)
\ No newline at end of file
+    It tells the app when to log the user creation.
+    With use_logging, the queue pipeline is started (with its defaults) if it is not
+    running yet: otherwise the INFO records would end up in the root logger, and be dropped"""
+    if use_logging:
+        if not queue_logging_running():
+            setup_queue_logging()
+        return subscribe('user_creation',handle_logging_user_registered_event)
+    elif batch:
+        return subscribe('user_creation',handle_log_users_registered_batch,batch=True)
+    else:
+        return subscribe('user_creation',handle_log_user_registered_event)
\ No newline at end of file
@@ -0,0 +1,178 @@
+# Registry of the subscribers of the event system.
+# Every subscription gets a handle, so a single subscriber can be removed in O(1)
+# (it is a key of a dict). What post_event iterates is an immutable snapshot (a tuple)
+# per event type, rebuilt on every change (copy on write). Posting never takes
+# a lock: it just reads whatever snapshot is there when it starts.
+#
+# Event types are topics made of dot separated words ('user.created'), and a
+# subscription may use wildcards:
+#   '*' matches exactly one word   -> 'user.*' gets 'user.created' but not 'user.a.b'
+#   '#' matches zero or more words -> 'user.#' gets 'user', 'user.created', 'user.a.b'
+# The subscribed event types live in a trie, so resolving a topic only walks the
+# branches that can match it. The resolved tuple is cached per topic, and the
+# cache is dropped when the subscriptions change. It holds max_resolved topics at
+# most (the oldest one goes first), as topics may be per entity ('user.<id>').
+import itertools
+import threading
+
+SEPARATOR = '.'
+ONE_WORD = '*'
+ANY_WORDS = '#'
+
+
+def is_pattern(event_type: str) -> bool:
+    return ONE_WORD in event_type or ANY_WORDS in event_type
+
+
+class Subscription:
+    """Handle returned by subscribe. Keep it to unsubscribe that single function"""
+    __slots__ = ('event_type', 'function', 'seq', '_registry')
+
+    def __init__(self, registry: 'SubscriberRegistry', event_type: str, function, seq: int) -> None:
+        self._registry = registry
+        self.event_type = event_type
+        self.function = function
+        self.seq = seq
+
+    def unsubscribe(self) -> bool:
+        """Removes the subscriber. Returns False if it was already removed"""
+        return self._registry.remove(self)
+
+    def __repr__(self) -> str:
+        name = getattr(self.function, '__name__', repr(self.function))
+        return f'Subscription({self.event_type!r}, {name})'
+
+
+class _TrieNode:
+    __slots__ = ('children', 'event_type')
+
+    def __init__(self) -> None:
+        self.children = dict()
+        self.event_type = None  # set when a subscribed event type ends at this node
+
+
+class SubscriberRegistry:
+    def __init__(self, max_resolved: int = 10_000) -> None:
+        # event type -> tuple of functions subscribed to exactly that event type
+        self.snapshots = dict()
+        # topic -> tuple of every function to call (exact + wildcard matches), oldest first
+        self.resolved = dict()
+        self.max_resolved = max_resolved
+        # event type -> {Subscription: function} (ordered, like the subscriptions)
+        self._entries = dict()
+        self._trie = _TrieNode()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    # --- Trie ---
+    def _trie_add(self, event_type: str) -> None:
+        node = self._trie
+        for word in event_type.split(SEPARATOR):
+            node = node.children.setdefault(word, _TrieNode())
+        node.event_type = event_type
+
+    def _trie_remove(self, event_type: str) -> None:
+        path = [self._trie]
+        words = event_type.split(SEPARATOR)
+        for word in words:
+            path.append(path[-1].children[word])
+        path[-1].event_type = None
+        # Prune the branches that lead nowhere
+        for word, node, parent in zip(reversed(words), reversed(path[1:]), reversed(path[:-1])):
+            if node.children or node.event_type is not None:
+                break
+            del parent.children[word]
+
+    def _match(self, node: _TrieNode, words: list, i: int, found: set) -> None:
+        any_words = node.children.get(ANY_WORDS)
+        if any_words is not None:
+            # '#' eats from zero up to all of the remaining words
+            for j in range(i, len(words) + 1):
+                self._match(any_words, words, j, found)
+        if i == len(words):
+            if node.event_type is not None:
+                found.add(node.event_type)
+            return
+        for child in (node.children.get(words[i]), node.children.get(ONE_WORD)):
+            if child is not None:
+                self._match(child, words, i + 1, found)
+
+    # --- Snapshots ---
+    def _publish(self, event_type: str) -> None:
+        entries = self._entries.get(event_type)
+        if entries:
+            self.snapshots[event_type] = tuple(entries.values())
+        else:
+            if self._entries.pop(event_type, None) is not None:
+                self._trie_remove(event_type)
+            self.snapshots.pop(event_type, None)
+        self.resolved.clear()
+
+    def resolve(self, topic: str) -> tuple:
+        """Every function subscribed to the topic, in subscription order.
+        The result is cached until the subscriptions change"""
+        with self._lock:
+            handlers = self.resolved.get(topic)
+            if handlers is not None:
+                return handlers
+            found = set()
+            self._match(self._trie, topic.split(SEPARATOR), 0, found)
+            if found == {topic}:
+                handlers = self.snapshots[topic]
+            else:
+                subscriptions = [s for event_type in found for s in self._entries[event_type].items()]
+                subscriptions.sort(key=lambda item: item[0].seq)
+                handlers = tuple(fn for _, fn in subscriptions)
+            if len(self.resolved) >= self.max_resolved:
+                del self.resolved[next(iter(self.resolved))]
+            self.resolved[topic] = handlers
+            return handlers
+
+    def add(self, event_type: str, function) -> Subscription:
+        with self._lock:
+            subscription = Subscription(self, event_type, function, next(self._seq))
+            if event_type not in self._entries:
+                self._entries[event_type] = dict()
+                self._trie_add(event_type)
+            self._entries[event_type][subscription] = function
+            self._publish(event_type)
+        return subscription
+
+    def remove(self, subscription: Subscription) -> bool:
+        with self._lock:
+            entries = self._entries.get(subscription.event_type)
+            if entries is None or entries.pop(subscription, None) is None:
+                return False
+            self._publish(subscription.event_type)
+        return True
+
+    def remove_function(self, event_type: str, function) -> bool:
+        """Removes the first subscription of a function (a scan, better keep the handle)"""
+        with self._lock:
+            for subscription, fn in self._entries.get(event_type, {}).items():
+                if fn == function:
+                    break
+            else:
+                return False
+        return self.remove(subscription)
+
+    def remove_event(self, event_type: str) -> bool:
+        with self._lock:
+            if event_type not in self._entries:
+                return False
+            self._entries[event_type].clear()
+            self._publish(event_type)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._trie = _TrieNode()
+            self.snapshots.clear()
+            self.resolved.clear()
+
+    def get(self, topic: str) -> tuple:
+        handlers = self.resolved.get(topic)
+        if handlers is None:
+            handlers = self.resolve(topic)
+        return handlers
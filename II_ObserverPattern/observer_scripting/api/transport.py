@@ -0,0 +1,382 @@
+# Events across processes, on a single host. A broker listens on a Unix socket;
+# every process connects to it (events.enable_transport), tells it which event
+# types it has subscribers for, and sends it the events it posts. The broker
+# forwards them, as they came, to the other processes subscribed to them
+# (wildcards included, matched with the same trie as the local registry).
+#
+# Wire format, all integers in network order:
+#   frame     : length (u32) | op (u8) | payload
+#   SUBSCRIBE : event type (utf-8)
+#   UNSUBSCRIBE : event type (utf-8), as it was subscribed
+#   PUBLISH   : topic length (u16) | topic | count (u32) | count x record
+#   PING/PONG : empty (a PONG comes back once every previous frame was handled)
+#   record    : tag (u8) | length (u32) | data
+# Users (the payload of 'user_creation') have their own compact encoding: the
+# length of each field (u32) followed by the fields. The views of the columnar
+# store are sent the same way, and come out as plain Users. Anything else is pickled.
+# Outgoing events are grouped per topic and sent every batch_size events or
+# flush_interval seconds, whatever comes first.
+# The broker holds at most max_outbox bytes for a connection: a subscriber that
+# falls further behind is disconnected, instead of growing the broker's memory.
+import os
+import pickle
+import selectors
+import socket
+import struct
+import threading
+import traceback
+from collections import defaultdict
+
+from lib.columnar_store import UserView
+from lib.database import User
+
+from .registry import SubscriberRegistry
+
+FRAME = struct.Struct('!IB')
+TOPIC = struct.Struct('!H')
+COUNT = struct.Struct('!I')
+RECORD = struct.Struct('!BI')
+USER_FIELDS = struct.Struct('!IIII')
+
+SUBSCRIBE, PUBLISH, PING, PONG, UNSUBSCRIBE = 1, 2, 3, 4, 5
+PICKLED, USER = 0, 1
+
+
+# --- Serialization ---
+def encode(data) -> bytes:
+    if type(data) is User or type(data) is UserView:
+        fields = [data.name.encode(), data.password.encode(), data.email.encode(), data.reset_code.encode()]
+        body = USER_FIELDS.pack(*map(len, fields)) + b''.join(fields)
+        return RECORD.pack(USER, len(body)) + body
+    body = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    return RECORD.pack(PICKLED, len(body)) + body
+
+
+def decode_records(payload: memoryview, offset: int, count: int) -> list:
+    records = []
+    for _ in range(count):
+        tag, length = RECORD.unpack_from(payload, offset)
+        offset += RECORD.size
+        body = payload[offset:offset + length]
+        offset += length
+        if tag == USER:
+            lengths = USER_FIELDS.unpack_from(body)
+            position = USER_FIELDS.size
+            fields = []
+            for size in lengths:
+                fields.append(str(body[position:position + size], 'utf-8'))
+                position += size
+            user = User(fields[0], fields[1], fields[2])
+            user.reset_code = fields[3]
+            records.append(user)
+        else:
+            records.append(pickle.loads(body))
+    return records
+
+
+def publish_frame(topic: str, records: list) -> bytes:
+    topic_bytes = topic.encode()
+    payload = b''.join([TOPIC.pack(len(topic_bytes)), topic_bytes, COUNT.pack(len(records)), *records])
+    return FRAME.pack(len(payload), PUBLISH) + payload
+
+
+def parse_publish(payload: memoryview) -> tuple:
+    """topic, count and offset of the first record of a PUBLISH payload"""
+    (topic_length,) = TOPIC.unpack_from(payload)
+    topic = str(payload[TOPIC.size:TOPIC.size + topic_length], 'utf-8')
+    offset = TOPIC.size + topic_length
+    (count,) = COUNT.unpack_from(payload, offset)
+    return topic, count, offset + COUNT.size
+
+
+def split_frames(buffer: bytearray):
+    """Yields (op, payload) of every complete frame at the start of buffer, and removes them"""
+    view = memoryview(buffer)
+    offset = 0
+    try:
+        while len(buffer) - offset >= FRAME.size:
+            length, op = FRAME.unpack_from(view, offset)
+            end = offset + FRAME.size + length
+            if end > len(buffer):
+                break
+            yield op, bytes(view[offset + FRAME.size:end]), bytes(view[offset:end])
+            offset = end
+    finally:
+        view.release()
+        del buffer[:offset]
+
+
+# --- Broker ---
+class _Connection:
+    __slots__ = ('sock', 'inbox', 'outbox', 'subscriptions')
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.subscriptions = dict()  # event type -> Subscription in the broker registry
+
+
+class Broker:
+    """Forwards the events between the connected processes (a single thread, with selectors).
+    A connection with more than max_outbox bytes waiting to be sent is dropped"""
+    def __init__(self, path: str, max_outbox: int = 64 << 20) -> None:
+        self.path = path
+        self.max_outbox = max_outbox
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen(128)
+        self._server.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+        self._registry = SubscriberRegistry()  # event type -> connections subscribed
+        self._wakeup_read, self._wakeup_write = socket.socketpair()
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ)
+        self._running = True
+        self._thread = None
+
+    def start(self) -> 'Broker':
+        """Serves from a daemon thread of this process"""
+        self._thread = threading.Thread(target=self.serve_forever, name='event-broker', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        while self._running:
+            for key, mask in self._selector.select():
+                if key.fileobj is self._server:
+                    self._accept()
+                elif key.fileobj is self._wakeup_read:
+                    self._wakeup_read.recv(64)
+                else:
+                    connection = key.data
+                    # Skip the connections dropped earlier in this same batch of events
+                    if mask & selectors.EVENT_READ and connection.sock.fileno() != -1:
+                        self._read(connection)
+                    if mask & selectors.EVENT_WRITE and connection.sock.fileno() != -1:
+                        self._write(connection)
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()
+        self._selector.close()
+        self._wakeup_write.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def close(self) -> None:
+        self._running = False
+        self._wakeup_write.send(b'x')
+        if self._thread is not None:
+            self._thread.join()
+
+    def _accept(self) -> None:
+        sock, _ = self._server.accept()
+        sock.setblocking(False)
+        self._selector.register(sock, selectors.EVENT_READ, _Connection(sock))
+
+    def _read(self, connection: _Connection) -> None:
+        try:
+            data = connection.sock.recv(1 << 20)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._drop(connection)
+            return
+        connection.inbox += data
+        for op, payload, frame in split_frames(connection.inbox):
+            if op == SUBSCRIBE:
+                event_type = payload.decode()
+                if event_type not in connection.subscriptions:
+                    connection.subscriptions[event_type] = self._registry.add(event_type, connection)
+            elif op == UNSUBSCRIBE:
+                subscription = connection.subscriptions.pop(payload.decode(), None)
+                if subscription is not None:
+                    subscription.unsubscribe()
+            elif op == PUBLISH:
+                topic = parse_publish(memoryview(payload))[0]
+                # dict.fromkeys: a connection subscribed through several patterns gets it once
+                for target in dict.fromkeys(self._registry.get(topic)):
+                    if target is not connection:
+                        self._send(target, frame)
+            elif op == PING:
+                self._send(connection, FRAME.pack(0, PONG))
+
+    def _send(self, connection: _Connection, frame: bytes) -> None:
+        if connection.sock.fileno() == -1:
+            return
+        if connection.outbox and len(connection.outbox) + len(frame) > self.max_outbox:
+            self._drop(connection)
+            return
+        was_empty = not connection.outbox
+        connection.outbox += frame
+        if was_empty:
+            self._write(connection)
+
+    def _write(self, connection: _Connection) -> None:
+        try:
+            sent = connection.sock.send(connection.outbox)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(connection)
+            return
+        del connection.outbox[:sent]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if connection.outbox else 0)
+        self._selector.modify(connection.sock, events, connection)
+
+    def _drop(self, connection: _Connection) -> None:
+        if connection.sock.fileno() == -1:
+            return
+        for subscription in connection.subscriptions.values():
+            subscription.unsubscribe()
+        connection.subscriptions.clear()
+        self._selector.unregister(connection.sock)
+        connection.sock.close()
+
+
+def start_broker(path: str, **kwargs) -> Broker:
+    """Starts a broker in a background thread of this process (kwargs: max_outbox)"""
+    return Broker(path, **kwargs).start()
+
+
+# --- Client ---
+class Transport:
+    """Connection of a process to the broker
+
+    Args:
+        path (str): Unix socket of the broker
+        deliver (Callable): deliver(event_type, list of events) for the events of other processes
+        batch_size (int): pending events that trigger a send
+        flush_interval (float): max seconds an event waits before being sent
+    """
+    def __init__(self, path: str, deliver, batch_size: int = 256, flush_interval: float = 0.005) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(path)
+        self._deliver = deliver
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = defaultdict(list)  # topic -> encoded records
+        self._n_pending = 0
+        self._lock = threading.Lock()       # pending events
+        self._send_lock = threading.Lock()  # socket writes (frames are never interleaved)
+        self._subscribe_lock = threading.RLock()  # subscriptions, sent in the order they change
+        self._subscribed = set()
+        self._pongs = threading.Semaphore(0)
+        self._closed = threading.Event()
+        self._reader = threading.Thread(target=self._read_loop, name='event-transport-reader', daemon=True)
+        self._flusher = threading.Thread(target=self._flush_loop, name='event-transport-flusher', daemon=True)
+        self._reader.start()
+        self._flusher.start()
+
+    def subscribe(self, event_type: str) -> None:
+        """Asks the broker for the events of event_type (a pattern is fine) posted by the others"""
+        with self._subscribe_lock:
+            if event_type not in self._subscribed:
+                self._subscribed.add(event_type)
+                data = event_type.encode()
+                self._sendall(FRAME.pack(len(data), SUBSCRIBE) + data)
+
+    def unsubscribe(self, event_type: str) -> None:
+        """Stops the events of event_type (as given to subscribe) coming from the broker"""
+        with self._subscribe_lock:
+            if event_type in self._subscribed:
+                self._subscribed.discard(event_type)
+                data = event_type.encode()
+                self._sendall(FRAME.pack(len(data), UNSUBSCRIBE) + data)
+
+    def unsubscribe_unused(self, in_use) -> None:
+        """Unsubscribes from every event type for which in_use(event_type) is False"""
+        with self._subscribe_lock:
+            for event_type in [event_type for event_type in self._subscribed if not in_use(event_type)]:
+                self.unsubscribe(event_type)
+
+    def publish(self, topic: str, data) -> None:
+        record = encode(data)
+        with self._lock:
+            self._pending[topic].append(record)
+            self._n_pending += 1
+            full = self._n_pending >= self.batch_size
+        if full:
+            self.flush()
+
+    def publish_many(self, topic: str, batch: list) -> None:
+        records = [encode(data) for data in batch]
+        with self._lock:
+            self._pending[topic].extend(records)
+            self._n_pending += len(records)
+            full = self._n_pending >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Sends every pending event now"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(list)
+            self._n_pending = 0
+        if pending:
+            self._sendall(b''.join(publish_frame(topic, records) for topic, records in pending.items()))
+
+    def sync(self, timeout: float = None) -> bool:
+        """Flushes, and waits until the broker has handled everything sent so far
+        (the subscriptions included). Returns False on timeout"""
+        self.flush()
+        self._sendall(FRAME.pack(0, PING))
+        return self._pongs.acquire(timeout=timeout)
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.flush()
+        self._flusher.join()
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._reader.join()
+        self._sock.close()
+
+    def _sendall(self, data: bytes) -> None:
+        with self._send_lock:
+            self._sock.sendall(data)
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            if self._n_pending:
+                self.flush()
+
+    def _read_loop(self) -> None:
+        inbox = bytearray()
+        while True:
+            try:
+                data = self._sock.recv(1 << 20)
+            except OSError:
+                return
+            if not data:
+                return
+            inbox += data
+            for op, payload, _ in split_frames(inbox):
+                if op == PUBLISH:
+                    view = memoryview(payload)
+                    topic, count, offset = parse_publish(view)
+                    try:
+                        self._deliver(topic, decode_records(view, offset, count))
+                    except Exception as e:
+                        # A failing subscriber must not stop the delivery of the next events
+                        traceback.print_exception(e)
+                elif op == PONG:
+                    self._pongs.release()
+
+
+if __name__ == '__main__':
+    # Standalone broker:  python -m api.transport /tmp/events.sock
+    import sys
+    broker = Broker(sys.argv[1] if len(sys.argv) > 1 else '/tmp/observer_events.sock')
+    print(f'Broker listening on {broker.path}')
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
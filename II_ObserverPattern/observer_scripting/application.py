@@ -1,13 +1,30 @@
 # This is the file from which the app is launched
 # This is the file where the actual observer pattern is working, and we launch the 'app'
+# It is started in short lived worker processes, so the start up has to be fast:
+# the listeners are subscribed by name, and only imported with the first event
+import atexit
 
+from api import events
 from api.registration import register_new_user
-from api.log_listener import setup_handle_log_user_creation
 
 #Having this here allows us to enable and disable users at will ...
-setup_handle_log_user_creation()
+#(same subscriber as api.log_listener.setup_handle_log_user_creation)
+events.subscribe('user_creation','api.log_listener:handle_log_user_registered_event')
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Observer pattern demo app')
+    parser.add_argument('--dump-stats', metavar='PATH',
+                        help='record dispatch stats and write them at exit '
+                             '(json if PATH ends with .json, Prometheus text otherwise)')
+    return parser.parse_args(argv)
+
 
 if __name__ == '__main__':
+    args = parse_args()
+    if args.dump_stats:
+        atexit.register(events.enable_instrumentation().dump, args.dump_stats)
+
     #Worst user ever
     register_new_user('Ambrosio','1234','ambrosio_1234@hotmail.com')
-    
\ No newline at end of file
@@ -0,0 +1,56 @@
+# Latency of post_event, synchronous vs asynchronous dispatch, with a slow listener
+# Launch it from this folder:  python benchmark_async_dispatch.py [n_events]
+import asyncio
+import statistics
+import sys
+import time
+
+from api import events
+
+
+def slow_listener(data):
+    # Mimics a listener printing to a blocked stdout
+    time.sleep(0.0002)
+
+async def slow_coroutine_listener(data):
+    await asyncio.sleep(0)
+
+
+def post_latencies(n_events: int) -> list:
+    latencies = []
+    for i in range(n_events):
+        start = time.perf_counter()
+        events.post_event('user_creation', i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list, total: float) -> None:
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f'{label:>28} | p50 {p50:8.1f} us | p99 {p99:8.1f} us | total {total:6.2f} s')
+
+
+def main(n_events: int):
+    events.subscribe('user_creation', slow_listener)
+    events.subscribe('user_creation', slow_coroutine_listener)
+
+    # The synchronous path can not call coroutines, so they are left out
+    events.unsubscribe('user_creation', slow_coroutine_listener)
+    start = time.perf_counter()
+    latencies = post_latencies(n_events)
+    report('synchronous', latencies, time.perf_counter() - start)
+    events.subscribe('user_creation', slow_coroutine_listener)
+
+    for maxsize in (n_events, 100):
+        events.enable_async_dispatch(maxsize=maxsize)
+        start = time.perf_counter()
+        latencies = post_latencies(n_events)
+        events.drain()
+        report(f'async (queue of {maxsize})', latencies, time.perf_counter() - start)
+        events.disable_async_dispatch()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
@@ -0,0 +1,53 @@
+# Throughput of posting events one by one vs in batches (bulk import of users)
+# Launch it from this folder:  python benchmark_batching.py [n_events]
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from api import events
+from api.batching import EventBatcher
+from api.log_listener import setup_handle_log_user_creation
+from lib.database import User
+
+
+def users(n_events: int):
+    for i in range(n_events):
+        yield User(f'name_{i}', 'pass', f'user_{i}@mail.com')
+
+
+def one_by_one(n_events: int) -> None:
+    post_event = events.post_event
+    for user in users(n_events):
+        post_event('user_creation', user)
+
+def batched(n_events: int, batch_size: int) -> None:
+    events.post_events('user_creation', users(n_events), batch_size=batch_size)
+
+def with_batcher(n_events: int, batch_size: int) -> None:
+    with EventBatcher('user_creation', batch_size=batch_size, flush_interval=0.5) as batcher:
+        for user in users(n_events):
+            batcher.post(user)
+
+
+def run(label: str, batch: bool, bench, *args) -> None:
+    events.clear_subscribers()
+    setup_handle_log_user_creation(batch=batch)
+    n_events = args[0]
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        bench(*args)
+        elapsed = time.perf_counter() - start
+    print(f'{label:>36} : {n_events / elapsed:12.0f} events/s')
+
+
+def main(n_events: int):
+    run('post_event, per event handler', False, one_by_one, n_events)
+    run('post_events, per event handler', False, batched, n_events, 1_000)
+    for batch_size in (100, 1_000, 10_000):
+        run(f'post_events, batch handler ({batch_size})', True, batched, n_events, batch_size)
+    run('EventBatcher, batch handler (1000)', True, with_batcher, n_events, 1_000)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
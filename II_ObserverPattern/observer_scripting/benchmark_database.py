@@ -0,0 +1,53 @@
+# Benchmark for the user store: the lookup latency should stay flat
+# no matter how many users are registered.
+# Launch it from this folder:  python benchmark_database.py [sizes ...]
+# (10_000_000 users needs a few GB of RAM, hence it is not a default size)
+import random
+import sys
+import time
+
+from lib.database import User, UserRepository
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def fill_repository(size: int) -> UserRepository:
+    repo = UserRepository(secondary_indices=('name',))
+    for i in range(size):
+        repo.add(User(f'name_{i % 1000}', 'pass', f'user_{i}@mail.com'))
+    return repo
+
+
+def time_lookups(repo: UserRepository, size: int, n_lookups: int = 100_000) -> float:
+    """Returns the mean lookup time (in ns)"""
+    emails = [f'user_{random.randrange(size)}@mail.com' for _ in range(n_lookups)]
+    get = repo.get
+    start = time.perf_counter()
+    for email in emails:
+        get(email)
+    return (time.perf_counter() - start) / n_lookups * 1e9
+
+
+def linear_scan(repo: UserRepository, email: str):
+    """The old find_user, for comparison"""
+    for user in repo:
+        if user.email == email:
+            return user
+
+
+def main(sizes):
+    print(f'{"users":>12} | {"indexed (ns)":>12} | {"linear scan (ns)":>16}')
+    for size in sizes:
+        repo = fill_repository(size)
+        indexed = time_lookups(repo, size)
+        #The scan is way too slow to be repeated many times
+        n_scans = 20
+        start = time.perf_counter()
+        for _ in range(n_scans):
+            linear_scan(repo, f'user_{random.randrange(size)}@mail.com')
+        scan = (time.perf_counter() - start) / n_scans * 1e9
+        print(f'{size:>12} | {indexed:>12.0f} | {scan:>16.0f}')
+
+
+if __name__ == '__main__':
+    main([int(s) for s in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,51 @@
+# Throughput of CPU heavy subscribers, run inline or in thread/process pools
+# Launch it from this folder:  python benchmark_executors.py [n_events] [max_workers]
+import hashlib
+import os
+import sys
+import time
+
+from api import events
+from api.executors import INLINE, PROCESS, THREAD, collect_errors, configure_executors, shutdown_executors
+
+
+def hash_password(data):
+    # hashlib releases the GIL, so threads can spread it over cores
+    return hashlib.pbkdf2_hmac('sha256', str(data).encode(), b'salt', 2_000)
+
+def enrich_user(data):
+    # Pure python work -> only processes help
+    total = 0
+    for i in range(20_000):
+        total += (i * data) % 7
+    return total
+
+
+def run(function, executor: str, n_events: int) -> float:
+    """Returns the events per second"""
+    events.clear_subscribers()
+    events.subscribe('user_creation', function, executor=executor)
+    start = time.perf_counter()
+    futures = []
+    for i in range(n_events):
+        futures.extend(events.post_event('user_creation', i))
+    errors = collect_errors(futures)
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return n_events / elapsed
+
+
+def main(n_events: int, max_workers: int):
+    workers = [w for w in (1, 2, 4, 8, 16) if w <= max_workers]
+    for function, executor in ((hash_password, THREAD), (enrich_user, PROCESS)):
+        print(f'{function.__name__} - inline : {run(function, INLINE, n_events):10.0f} events/s')
+        for n in workers:
+            configure_executors(thread_workers=n, process_workers=n)
+            print(f'{function.__name__} - {executor} x{n:<2} : {run(function, executor, n_events):10.0f} events/s')
+    shutdown_executors()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count())
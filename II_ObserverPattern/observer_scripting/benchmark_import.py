@@ -0,0 +1,50 @@
+# Import speed (rows per second) of the SQLite user store: one create_user per row,
+# create_user with grouped transactions, and bulk_create_users streaming a generator
+# Launch it from this folder:  python benchmark_import.py [n_rows]
+import os
+import sys
+import tempfile
+import time
+
+from lib import database
+from lib.sqlite_store import SqliteUserStore
+
+
+def rows(n_rows: int, prefix: str):
+    for i in range(n_rows):
+        yield f'name_{i % 1000}', 'pass', f'{prefix}_{i}@mail.com'
+
+
+def run(label: str, path: str, n_rows: int, bulk: bool, write_batch_size: int = 100) -> None:
+    store = SqliteUserStore(path, write_batch_size=write_batch_size)
+    database.set_user_store(store)
+    start = time.perf_counter()
+    if bulk:
+        database.bulk_create_users(rows(n_rows, label))
+    else:
+        for row in rows(n_rows, label):
+            database.create_user(*row)
+        store.flush()
+    elapsed = time.perf_counter() - start
+    print(f'{label:>28} : {n_rows / elapsed:12.0f} rows/s')
+    store.close()
+
+
+def main(n_rows: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'users.db')
+        run('create_user (autocommit)', path, max(n_rows // 100, 100), False, write_batch_size=1)
+        run('create_user (batches 1000)', path, n_rows // 10, False, write_batch_size=1_000)
+        run('bulk_create_users', path, n_rows, True)
+        store = SqliteUserStore(path)
+        lookups = min(n_rows, 10_000)
+        start = time.perf_counter()
+        for i in range(lookups):
+            store.get(f'bulk_create_users_{i}@mail.com')
+        print(f'{"find_user":>28} : {lookups / (time.perf_counter() - start):12.0f} lookups/s'
+              f' ({len(store)} users stored)')
+        store.close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,65 @@
+# Append throughput of the event journal with every fsync policy, and replay speed
+# Launch it from this folder:  python benchmark_journal.py [n_replay_events] [n_append_events]
+# (10_000_000 replay events need ~1 GB of disk)
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from api.journal import ALWAYS, BATCH, NEVER, EventJournal
+from lib.database import User
+
+
+def append(directory: str, fsync: str, n_events: int, n_threads: int = 1, wait: bool = False) -> float:
+    """Returns the appends per second"""
+    user = User('name', 'pass', 'user@mail.com')
+    with EventJournal(directory, fsync=fsync) as journal:
+        def work():
+            for _ in range(n_events // n_threads):
+                journal.append('user_creation', user, wait=wait)
+        threads = [threading.Thread(target=work) for _ in range(n_threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        journal.sync()
+        return n_events / (time.perf_counter() - start)
+
+
+def main(n_replay: int, n_append: int):
+    root = tempfile.mkdtemp(prefix='journal_bench_')
+    try:
+        cases = ((ALWAYS, 1, False, n_append // 20),
+                 (BATCH, 1, False, n_append),
+                 (BATCH, 8, True, n_append // 10),   # durable appends: the threads share the fsyncs
+                 (NEVER, 1, False, n_append))
+        for i, (fsync, n_threads, wait, n_events) in enumerate(cases):
+            rate = append(f'{root}/append_{i}', fsync, n_events, n_threads, wait)
+            label = f'{fsync}{" (wait, " + str(n_threads) + " threads)" if wait else ""}'
+            print(f'append {label:>26} : {rate:12.0f} events/s')
+
+        directory = f'{root}/replay'
+        with EventJournal(directory, fsync=NEVER) as journal:
+            for i in range(n_replay):
+                journal.append('user_creation', i)
+            count = 0
+            def counter(data):
+                nonlocal count
+                count += 1
+            start = time.perf_counter()
+            journal.replay(counter)
+            elapsed = time.perf_counter() - start
+            assert count == n_replay
+            start = time.perf_counter()
+            journal.replay(counter, from_offset=n_replay - 1000)
+            tail = (time.perf_counter() - start) * 1e3
+        print(f'replay {n_replay} events : {n_replay / elapsed:12.0f} events/s | last 1000 from offset: {tail:.1f} ms')
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200_000)
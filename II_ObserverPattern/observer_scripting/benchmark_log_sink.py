@@ -0,0 +1,41 @@
+# Messages per second and enqueue latency of log_stuff, printing vs using a LogSink
+# Launch it from this folder:  python benchmark_log_sink.py [n_messages]
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from lib import log
+from lib.log_sink import LogSink
+
+
+def run(label: str, n_messages: int) -> None:
+    log_stuff = log.log_stuff
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n_messages):
+        t0 = time.perf_counter()
+        log_stuff(f'User name_{i} created, with and email user_{i}@mail.com')
+        latencies.append(time.perf_counter() - t0)
+    enqueued = time.perf_counter() - start
+    if log.sink is not None:
+        log.sink.flush()
+    total = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f'{label:>16} | {n_messages / enqueued:10.0f} msg/s (caller) | {n_messages / total:10.0f} msg/s (written)'
+          f' | p50 {p50:6.2f} us | p99 {p99:6.2f} us', file=sys.stderr)
+
+
+def main(n_messages: int):
+    with open(os.devnull, 'w') as devnull:
+        with redirect_stdout(devnull):
+            run('print', n_messages)
+        log.use_sink(LogSink(devnull, capacity=n_messages))
+        run('LogSink', n_messages)
+        log.use_sink(False)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,48 @@
+# Registration throughput with the log listener going through print, through the
+# logging QueueHandler pipeline (level enabled) and with logging disabled
+# Launch it from this folder:  python benchmark_logging.py [n_users]
+import logging
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from api import events
+from api.log_listener import setup_handle_log_user_creation
+from api.registration import register_new_user
+from lib import database
+from lib.log_pipeline import setup_queue_logging, shutdown_queue_logging
+
+
+def run(label: str, n_users: int, flush=None) -> None:
+    database.users.clear()
+    start = time.perf_counter()
+    for i in range(n_users):
+        register_new_user(f'name_{i}', 'pass', f'user_{i}@mail.com')
+    registered = time.perf_counter() - start
+    if flush is not None:
+        flush()
+    total = time.perf_counter() - start
+    print(f'{label:>24} : {n_users / registered:10.0f} users/s (registration)'
+          f' | {n_users / total:10.0f} users/s (logs written)', file=sys.stderr)
+
+
+def main(n_users: int):
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        setup_handle_log_user_creation()
+        run('print', n_users)
+
+        events.clear_subscribers()
+        setup_handle_log_user_creation(use_logging=True)
+        setup_queue_logging(logging.INFO, handlers=[logging.StreamHandler(devnull)], lean_records=True)
+        run('logging on (queue)', n_users, flush=shutdown_queue_logging)
+
+        setup_queue_logging(logging.WARNING, handlers=[logging.StreamHandler(devnull)], lean_records=True)
+        run('logging off (level)', n_users, flush=shutdown_queue_logging)
+
+        events.clear_subscribers()
+        run('no listener', n_users)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
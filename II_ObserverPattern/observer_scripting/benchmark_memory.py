@@ -0,0 +1,71 @@
+# Memory benchmark for the different ways of storing users.
+# Launch it from this folder:  python benchmark_memory.py [n_users]
+import sys
+import tracemalloc
+
+from lib.columnar_store import ColumnarUserStore
+from lib.database import User, UserRepository
+
+sys.path.append('..')
+from logging_functionality.objects_file import User as DataclassUser
+
+
+class DictUser:
+    """The User as it used to be (one __dict__ per instance)"""
+    def __init__(self, name: str, password: str, email: str) -> None:
+        self.name = name
+        self.email = email
+        self.password = password
+        self.reset_code = ""
+
+
+def rows(n_users: int):
+    # Realistic-ish: few distinct names and passwords, unique emails
+    for i in range(n_users):
+        yield f'name_{i % 500}', f'pass_{i % 50}', f'user_{i}@mail.com'
+
+
+def measure(build, n_users: int) -> float:
+    """Bytes per user allocated while building (and keeping) the population"""
+    tracemalloc.start()
+    keep = build(n_users)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return size / n_users
+
+
+def build_dict_users(n_users):
+    return [DictUser(*row) for row in rows(n_users)]
+
+def build_slotted_users(n_users):
+    return [User(*row) for row in rows(n_users)]
+
+def build_dataclass_users(n_users):
+    return [DataclassUser(name, 'Doe', email) for name, _, email in rows(n_users)]
+
+def build_repository(n_users):
+    repo = UserRepository()
+    for row in rows(n_users):
+        repo.add(User(*row))
+    return repo
+
+def build_columnar(n_users):
+    store = ColumnarUserStore()
+    for row in rows(n_users):
+        store.append(*row)
+    return store
+
+
+def main(n_users: int):
+    print(f'Bytes per user ({n_users} users, strings included)')
+    for label, build in (('dict-backed User list', build_dict_users),
+                         ('slotted User list', build_slotted_users),
+                         ('slotted dataclass User list', build_dataclass_users),
+                         ('UserRepository (slotted + index)', build_repository),
+                         ('ColumnarUserStore (+ index)', build_columnar)):
+        print(f'{label:>34} : {measure(build, n_users):8.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,62 @@
+# Stress test + benchmark of the subscriber registry: some threads keep subscribing
+# and unsubscribing handlers while the main thread posts events as fast as it can.
+# Launch it from this folder:  python benchmark_registry.py [seconds] [churn_threads]
+import sys
+import threading
+import time
+
+from api import events
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, data) -> None:
+        self.calls += 1
+
+
+def churn(stop: threading.Event, stats: dict, n_handlers: int = 50) -> None:
+    handles = []
+    while not stop.is_set():
+        handles.append(events.subscribe('user_creation', Counter()))
+        if len(handles) > n_handlers:
+            # Removing the oldest handler, the case a list would do in O(n)
+            assert handles.pop(0).unsubscribe()
+        stats['changes'] += 1
+    for handle in handles:
+        handle.unsubscribe()
+
+
+def main(seconds: float, n_threads: int):
+    permanent = Counter()
+    events.subscribe('user_creation', permanent)
+
+    stop = threading.Event()
+    stats = {'changes': 0}
+    threads = [threading.Thread(target=churn, args=(stop, stats)) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+
+    posted = 0
+    post_event = events.post_event
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for i in range(1_000):
+            post_event('user_creation', i)
+        posted += 1_000
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    # Every post reached the permanent handler, and the churned ones are all gone
+    assert permanent.calls == posted, (permanent.calls, posted)
+    assert events.subscribers['user_creation'] == (permanent,)
+    print(f'{posted / elapsed:10.0f} posts/s | {stats["changes"] / elapsed:10.0f} (un)subscriptions/s'
+          f' | {n_threads} churn threads - OK')
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4)
@@ -0,0 +1,79 @@
+# Start up time of the app (import application), which runs in short lived workers.
+#  - wall clock: median of fresh interpreters importing application, minus a bare interpreter
+#  - python -X importtime: the modules that take the longest (cumulative time)
+#  - the heavy modules that must not be imported at start up (they are deferred until used)
+# It fails (exit code 1) if the start up is over the budget or a deferred module is imported,
+# so it can be run as a check:  python benchmark_startup.py [--budget-ms 40] [--runs 15]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Only needed by the first event, the first pool, or the command line parsing
+DEFERRED = ('api.log_listener', 'lib.log', 'lib.log_pipeline', 'logging', 'argparse',
+            'concurrent.futures', 'multiprocessing', 'asyncio', 'sqlite3')
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=HERE, capture_output=True, text=True, check=True)
+
+
+def wall_clock(code: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run_python(code)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def import_times(top: int) -> list:
+    """(cumulative us, module) of the slowest imports, from python -X importtime"""
+    stderr = run_python('import application', '-X', 'importtime').stderr
+    rows = []
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Start up time of the observer app')
+    parser.add_argument('--budget-ms', type=float, default=40.0,
+                        help='max time to import application, over a bare interpreter')
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    bare = wall_clock('pass', args.runs)
+    app = wall_clock('import application', args.runs)
+    startup_ms = (app - bare) * 1000
+    print(f'bare interpreter : {bare * 1000:7.1f} ms')
+    print(f'import app       : {app * 1000:7.1f} ms  ->  {startup_ms:.1f} ms of start up (budget {args.budget_ms:.0f} ms)')
+
+    print('slowest imports (cumulative):')
+    for cumulative, module in import_times(10):
+        print(f'  {cumulative / 1000:7.1f} ms  {module}')
+
+    loaded = run_python('import sys, application; print(" ".join(sys.modules))').stdout.split()
+    eager = [module for module in DEFERRED if module in loaded]
+    failures = []
+    if eager:
+        failures.append(f'modules imported at start up that should be deferred: {", ".join(eager)}')
+    if startup_ms > args.budget_ms:
+        failures.append(f'start up of {startup_ms:.1f} ms is over the budget of {args.budget_ms:.0f} ms')
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    if failures:
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
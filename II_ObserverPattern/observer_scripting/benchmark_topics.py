@@ -0,0 +1,62 @@
+# Posting to a hot topic with thousands of wildcard subscriptions around.
+# Compares the routing trie + per-topic cache with matching every pattern on every post.
+# Launch it from this folder:  python benchmark_topics.py [n_patterns]
+import re
+import sys
+import time
+
+from api import events
+
+
+def noop(data):
+    pass
+
+
+def pattern_to_regex(pattern: str):
+    regex = re.escape(pattern).replace(r'\*', r'[^.]+').replace(r'\#', r'.*')
+    return re.compile(f'^{regex}$')
+
+
+def subscribe_patterns(n_patterns: int) -> list:
+    patterns = []
+    for i in range(n_patterns):
+        # Mostly unrelated services, plus a few patterns matching the user topics
+        patterns.append(f'service_{i}.*' if i % 2 else f'service_{i}.#')
+    patterns.extend(['user.*', 'user.#', '*.created'])
+    for pattern in patterns:
+        events.subscribe(pattern, noop)
+    return patterns
+
+
+def main(n_patterns: int, n_posts: int = 200_000):
+    patterns = subscribe_patterns(n_patterns)
+    events.subscribe('user.created', noop)
+
+    post_event = events.post_event
+    start = time.perf_counter()
+    for i in range(n_posts):
+        post_event('user.created', i)
+    trie = (time.perf_counter() - start) / n_posts * 1e9
+
+    # The naive way: test every pattern on every post
+    compiled = [(pattern_to_regex(p), noop) for p in patterns]
+    n_naive = max(n_posts // n_patterns, 10)
+    start = time.perf_counter()
+    for i in range(n_naive):
+        for regex, fn in compiled:
+            if regex.match('user.created'):
+                fn(i)
+    naive = (time.perf_counter() - start) / n_naive * 1e9
+
+    events.subscribe('user.deleted', noop)  # Invalidates the cache
+    start = time.perf_counter()
+    events.registry.resolve('user.created')
+    miss = (time.perf_counter() - start) * 1e9
+    print(f'{n_patterns:>7} patterns | cached post {trie:8.0f} ns | first post after a change {miss:10.0f} ns'
+          f' | naive matching {naive:12.0f} ns')
+    events.clear_subscribers()
+
+
+if __name__ == '__main__':
+    for n in ([int(sys.argv[1])] if len(sys.argv) > 1 else (100, 1_000, 10_000)):
+        main(n)
@@ -0,0 +1,196 @@
+# Events across processes (api.transport): 1 to N producer processes post users,
+# this process (which also runs the broker) receives them all.
+#  - events/s: received events over the time from the start signal to the last one
+#  - latency: from post_event in the producer to the subscriber in the consumer. The send
+#    time goes in the reset_code of the user (time.monotonic_ns is the same clock for
+#    every process of the host)
+# Each configuration is run with batching (the default) and without it (batch_size=1).
+# It first checks that the broker survives subscribers hanging up while events are published,
+# that it drops the subscribers that stop reading, that unsubscribing stops the events,
+# and that users with long fields go through.
+# Launch it from this folder:  python benchmark_transport.py [events per producer] [max producers]
+import multiprocessing
+import os
+import socket
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from api import events
+from api.transport import FRAME, SUBSCRIBE, Transport, decode_records, encode, start_broker
+from lib.database import User
+
+
+def producer(path: str, n_events: int, batch_size: int, name: str, ready, go) -> None:
+    events.enable_transport(path, batch_size=batch_size)
+    events.transport.sync()
+    ready.put(name)
+    go.wait()
+    for i in range(n_events):
+        user = User(f'{name}_{i}', 'password', f'{name}_{i}@mail.com')
+        user.reset_code = str(time.monotonic_ns())
+        events.post_event('user_creation', user)
+    events.disable_transport()
+
+
+class Consumer:
+    def __init__(self, expected: int) -> None:
+        self.expected = expected
+        self.latencies = []
+        self.last = 0
+        self.done = threading.Event()
+
+    def __call__(self, user: User) -> None:
+        now = time.monotonic_ns()
+        self.latencies.append(now - int(user.reset_code))
+        if len(self.latencies) == self.expected:
+            self.last = now
+            self.done.set()
+
+
+def run(path: str, n_producers: int, n_events: int, batch_size: int) -> tuple:
+    consumer = Consumer(n_producers * n_events)
+    subscription = events.subscribe('user_creation', consumer)
+    ctx = multiprocessing.get_context('spawn')
+    ready, go = ctx.Queue(), ctx.Event()
+    processes = [ctx.Process(target=producer, args=(path, n_events, batch_size, f'p{i}', ready, go))
+                 for i in range(n_producers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+    start = time.monotonic_ns()
+    go.set()
+    received = consumer.done.wait(timeout=120)
+    for process in processes:
+        process.join()
+    subscription.unsubscribe()
+    if not received:
+        raise RuntimeError(f'{len(consumer.latencies)} of {consumer.expected} events received')
+    return consumer.expected / ((consumer.last - start) / 1e9), consumer.latencies
+
+
+def check_disconnect(path: str, broker) -> None:
+    """Subscribers that hang up (with a reset, mid stream) must not take the broker down"""
+    received = []
+    consumer = Transport(path, deliver=lambda topic, batch: received.extend(batch))
+    consumer.subscribe('disconnect_check')
+    publisher = Transport(path, deliver=lambda topic, batch: None, batch_size=1)
+    consumer.sync()
+    for _ in range(20):
+        peers = []
+        for _ in range(10):
+            peer = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            peer.connect(path)
+            peer.sendall(FRAME.pack(len(b'disconnect_check'), SUBSCRIBE) + b'disconnect_check')
+            peer.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            peers.append(peer)
+        assert publisher.sync(timeout=10), 'the broker stopped answering'
+        for i in range(200):
+            publisher.publish('disconnect_check', i)
+            if i == 100:
+                for peer in peers:
+                    peer.close()
+        assert publisher.sync(timeout=10), 'the broker stopped answering'
+    assert consumer.sync(timeout=10), 'the broker stopped answering'
+    assert broker._thread.is_alive(), 'the broker thread died'
+    assert received == list(range(200)) * 20, f'{len(received)} of {200 * 20} events received'
+    publisher.close()
+    consumer.close()
+    print('subscribers hanging up mid stream: OK')
+
+
+def check_slow_subscriber(directory: str) -> None:
+    """A subscriber that never reads is dropped once max_outbox is reached, the others go on"""
+    path = os.path.join(directory, 'slow.sock')
+    broker = start_broker(path, max_outbox=1 << 20)
+    received = []
+    consumer = Transport(path, deliver=lambda topic, batch: received.extend(batch))
+    consumer.subscribe('slow_check')
+    slow = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    slow.connect(path)
+    slow.sendall(FRAME.pack(len(b'slow_check'), SUBSCRIBE) + b'slow_check')
+    publisher = Transport(path, deliver=lambda topic, batch: None, batch_size=1)
+    assert consumer.sync(timeout=10) and publisher.sync(timeout=10), 'the broker stopped answering'
+    payload = bytes(10_000)
+    for _ in range(1_000):
+        publisher.publish('slow_check', payload)
+    assert publisher.sync(timeout=10) and consumer.sync(timeout=10), 'the broker stopped answering'
+    assert len(broker._registry.get('slow_check')) == 1, 'the slow subscriber was not dropped'
+    assert len(received) == 1_000, f'{len(received)} of 1000 events received'
+    slow.close()
+    publisher.close()
+    consumer.close()
+    broker.close()
+    print('subscriber not reading dropped at max_outbox: OK')
+
+
+def check_unsubscribe(path: str) -> None:
+    """Once the last local subscriber of an event type is gone, the broker stops sending it"""
+    received = []
+    subscription = events.subscribe('unsubscribe_check', received.append)
+    events.transport.sync(timeout=10)
+    publisher = Transport(path, deliver=lambda topic, batch: None, batch_size=1)
+    publisher.publish('unsubscribe_check', 1)
+    assert publisher.sync(timeout=10) and events.transport.sync(timeout=10), 'the broker stopped answering'
+    events.unsubscribe('unsubscribe_check', received.append)
+    assert events.transport.sync(timeout=10), 'the broker stopped answering'
+    assert not events.transport._subscribed and received == [1], received
+    # Through the handle, the broker is told at the first event nobody wants
+    subscription = events.subscribe('unsubscribe_check', received.append)
+    events.transport.sync(timeout=10)
+    subscription.unsubscribe()
+    publisher.publish('unsubscribe_check', 2)
+    assert publisher.sync(timeout=10) and events.transport.sync(timeout=10), 'the broker stopped answering'
+    assert not events.transport._subscribed and received == [1], received
+    publisher.close()
+    print('unsubscribing stops the events of the broker: OK')
+
+
+def check_long_fields() -> None:
+    user = User('name', 'p' * 70_000, 'e' * 100_000)
+    user.reset_code = 'code'
+    record = encode(user)
+    (decoded,) = decode_records(memoryview(FRAME.pack(0, 0) + record), FRAME.size, 1)
+    assert (decoded.name, decoded.password, decoded.email, decoded.reset_code) == \
+        (user.name, user.password, user.email, user.reset_code)
+    print('users with fields over 64 KiB: OK')
+
+
+def report(n_producers: int, batch_size: int, rate: float, latencies: list) -> None:
+    latencies.sort()
+    p50 = statistics.median(latencies) / 1e3
+    p99 = latencies[int(len(latencies) * 0.99)] / 1e3
+    print(f'{n_producers:>9} | {batch_size:>10} | {rate:12.0f} events/s | '
+          f'p50 {p50:9.1f} us | p99 {p99:9.1f} us')
+
+
+def main(n_events: int, max_producers: int):
+    path = os.path.join(tempfile.mkdtemp(), 'events.sock')
+    broker = start_broker(path)
+    check_disconnect(path, broker)
+    check_slow_subscriber(os.path.dirname(path))
+    check_long_fields()
+    events.enable_transport(path)
+    check_unsubscribe(path)
+    print(f'{n_events} events per producer, {os.cpu_count()} cores')
+    print('producers | batch size |   throughput        |   latency')
+    try:
+        n_producers = 1
+        while n_producers <= max_producers:
+            for batch_size in (256, 1):
+                rate, latencies = run(path, n_producers, n_events, batch_size)
+                report(n_producers, batch_size, rate, latencies)
+            n_producers *= 2
+    finally:
+        events.disable_transport()
+        broker.close()
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else max(os.cpu_count() or 1, 4))
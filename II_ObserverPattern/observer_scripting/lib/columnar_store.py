@@ -0,0 +1,153 @@
+# Columnar version of the user store, for really big populations.
+# Instead of one object per user, every attribute lives in its own column:
+#  - names are interned and kept once in a table, the column holds their ids (array of uint32)
+#  - emails (unique) and passwords are plain lists of (interned) strings
+#  - reset codes are almost always empty, so they go into a sparse dict
+# The store hands out UserView objects, that behave like lib.database.User
+import sys
+from array import array
+
+from .database import User
+
+
+class UserView:
+    """Lightweight proxy over a row of the ColumnarUserStore. It has the same
+    attributes and methods as User, so listeners can not tell the difference"""
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: 'ColumnarUserStore', row: int) -> None:
+        self._store = store
+        self._row = row
+
+    @property
+    def name(self) -> str:
+        return self._store._names[self._store._name_ids[self._row]]
+
+    @property
+    def email(self) -> str:
+        return self._store._emails[self._row]
+
+    @property
+    def password(self) -> str:
+        return self._store._passwords[self._row]
+
+    @password.setter
+    def password(self, value: str) -> None:
+        self._store._passwords[self._row] = sys.intern(value)
+
+    @property
+    def reset_code(self) -> str:
+        return self._store._reset_codes.get(self._row, "")
+
+    @reset_code.setter
+    def reset_code(self, value: str) -> None:
+        if value:
+            self._store._reset_codes[self._row] = value
+        else:
+            self._store._reset_codes.pop(self._row, None)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, UserView):
+            return self._store is other._store and self._row == other._row
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self._row))
+
+    def detach(self) -> User:
+        """Copy of the row as a plain User, independent of the store"""
+        return _detached_user(self.name, self.password, self.email, self.reset_code)
+
+    def __reduce__(self):
+        # Pickled (journal, process pools ...) as a detached User, not with the whole store
+        return _detached_user, (self.name, self.password, self.email, self.reset_code)
+
+    __repr__ = User.__repr__
+    new_password = User.new_password
+
+
+def _detached_user(name: str, password: str, email: str, reset_code: str) -> User:
+    user = User(name, password, email)
+    user.reset_code = reset_code
+    return user
+
+
+class ColumnarUserStore:
+    """Drop-in replacement of lib.database.UserRepository (add, get, remove,
+    find_by ...) storing the users column by column"""
+
+    def __init__(self) -> None:
+        self._names = []                # name id -> name
+        self._name_to_id = dict()       # name -> name id
+        self._name_ids = array('I')     # row -> name id
+        self._emails = []               # row -> email (None once removed)
+        self._passwords = []            # row -> password
+        self._reset_codes = dict()      # row -> reset code (only the non empty ones)
+        self._rows = dict()             # email -> row
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self):
+        for row in self._rows.values():
+            yield UserView(self, row)
+
+    def __contains__(self, email: str) -> bool:
+        return email in self._rows
+
+    def _name_id(self, name: str) -> int:
+        try:
+            return self._name_to_id[name]
+        except KeyError:
+            name_id = self._name_to_id[name] = len(self._names)
+            self._names.append(sys.intern(name))
+            return name_id
+
+    def append(self, name: str, password: str, email: str) -> UserView:
+        """Adds a new row without building any intermediate User object"""
+        if email in self._rows:
+            raise Exception(f"User with email {email} already exists")
+        row = len(self._emails)
+        self._name_ids.append(self._name_id(name))
+        self._emails.append(email)
+        self._passwords.append(sys.intern(password))
+        self._rows[email] = row
+        return UserView(self, row)
+
+    def add(self, user: User) -> UserView:
+        view = self.append(user.name, user.password, user.email)
+        if user.reset_code:
+            view.reset_code = user.reset_code
+        return view
+
+    def get(self, email: str) -> UserView:
+        try:
+            return UserView(self, self._rows[email])
+        except KeyError:
+            raise Exception(f"User with email {email} not found") from None
+
+    def remove(self, email: str) -> User:
+        """Removes the row (it is left as a tombstone) and returns a detached User"""
+        view = self.get(email)
+        user = User(view.name, view.password, view.email)
+        user.reset_code = view.reset_code
+        del self._rows[email]
+        self._emails[view._row] = None
+        self._passwords[view._row] = None
+        self._reset_codes.pop(view._row, None)
+        return user
+
+    def find_by(self, attr: str, value) -> list:
+        if attr == 'email':
+            return [self.get(value)] if value in self._rows else []
+        if attr != 'name':
+            raise Exception(f"There is no index for the attribute {attr}")
+        # No index here (it would cost as much memory as the column itself), so it is a scan
+        name_id = self._name_to_id.get(value)
+        if name_id is None:
+            return []
+        return [UserView(self, row) for row in self._rows.values()
+                if self._name_ids[row] == name_id]
+
+    def clear(self) -> None:
+        self.__init__()
@@ -1,9 +1,10 @@
 # This checks a supposed database and works to create or find users
-#List of users
-users = []
 
 # It is nice to have users being classes, as we are providing info and methods (reset passwords)
 class User:
+    # No per instance __dict__ -> much less memory when holding millions of users
+    __slots__ = ('name', 'email', 'password', 'reset_code')
+
     def __init__(self,name: str, password : str , email : str) -> None:
         self.name = name
         self.email = email
@@ -22,16 +23,106 @@ class User:
         self.password = new_password
 
 
+class UserRepository:
+    """In-memory store of users, indexed by email (unique) and, optionally,
+    by any other attribute (name, ...). Every lookup is a dict access, so
+    it costs the same with 10 users or with 10 million of them."""
+
+    def __init__(self, secondary_indices: tuple = ()) -> None:
+        self._by_email = dict()
+        # attribute -> {value -> [users]}. Several users may share a name
+        self._indices = {attr: dict() for attr in secondary_indices}
+
+    def __len__(self) -> int:
+        return len(self._by_email)
+
+    def __iter__(self):
+        return iter(self._by_email.values())
+
+    def __contains__(self, email: str) -> bool:
+        return email in self._by_email
+
+    def add_index(self, attr: str) -> None:
+        """Creates a secondary index over an attribute of the users,
+        including the ones already stored"""
+        if attr in self._indices:
+            return
+        index = self._indices[attr] = dict()
+        for user in self._by_email.values():
+            index.setdefault(getattr(user, attr), []).append(user)
+
+    def add(self, user: User) -> User:
+        """Stores a user. Emails are unique, so a repeated one is rejected"""
+        if user.email in self._by_email:
+            raise Exception(f"User with email {user.email} already exists")
+        self._by_email[user.email] = user
+        for attr, index in self._indices.items():
+            index.setdefault(getattr(user, attr), []).append(user)
+        return user
+
+    def remove(self, email: str) -> User:
+        """Removes (and returns) the user stored under the given email"""
+        user = self.get(email)
+        del self._by_email[email]
+        for attr, index in self._indices.items():
+            bucket = index[getattr(user, attr)]
+            bucket.remove(user)
+            if not bucket:
+                del index[getattr(user, attr)]
+        return user
+
+    def get(self, email: str) -> User:
+        """O(1) lookup by email"""
+        try:
+            return self._by_email[email]
+        except KeyError:
+            raise Exception(f"User with email {email} not found") from None
+
+    def find_by(self, attr: str, value) -> list:
+        """Lookup through a secondary index. Returns every matching user"""
+        if attr == 'email':
+            return [self._by_email[value]] if value in self._by_email else []
+        if attr not in self._indices:
+            raise Exception(f"There is no index for the attribute {attr}")
+        return list(self._indices[attr].get(value, ()))
+
+    def clear(self) -> None:
+        self._by_email.clear()
+        for index in self._indices.values():
+            index.clear()
+
+
+#Store of users (it used to be a plain list, scanned on every lookup)
+users = UserRepository(secondary_indices=('name',))
+
+def set_user_store(store) -> None:
+    """Swaps the store used by create_user/find_user (e.g. a ColumnarUserStore
+    from lib.columnar_store for very large populations, or a persistent
+    SqliteUserStore from lib.sqlite_store)"""
+    global users
+    users = store
+
+
 def create_user(name : str,password :str,email : str):
     """function that creates the users, called from this module somewhere else"""
     new_user = User(name,password,email)
-    users.append(new_user)
-    return new_user
+    return users.add(new_user)
+
+def bulk_create_users(rows) -> int:
+    """Creates users from an iterable of (name, password, email), streaming it
+    into the store when it supports it (see lib.sqlite_store). Returns how many were created"""
+    if hasattr(users,'bulk_add'):
+        return users.bulk_add(rows)
+    count = 0
+    for name, password, email in rows:
+        users.add(User(name,password,email))
+        count += 1
+    return count
 
 def find_user(email:str):
     """Finder function for the potential users added to the database"""
-    for user in users:
-        if user.email == email:
-            return user
-    raise Exception(f"User with email {email} not found")
+    return users.get(email)
 
+def find_users_by_name(name:str) -> list:
+    """Finder function for all the users sharing a name"""
+    return users.find_by('name',name)
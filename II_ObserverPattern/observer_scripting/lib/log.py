@@ -1,8 +1,35 @@
 # This is the script that definde what the logging does
 
-# In a real application, this is already coded in the logging module, 
+# In a real application, this is already coded in the logging module,
 # but this part is just for show ...
 from datetime import datetime
 
+# When set (see use_sink), messages go to a buffered LogSink instead of print
+sink = None
+
+def use_sink(new_sink=None):
+    """Sends the logs through a lib.log_sink.LogSink (a new one to stdout if none is given).
+    Passing False goes back to printing every message"""
+    global sink
+    if new_sink is None:
+        from .log_sink import LogSink
+        new_sink = LogSink()
+    if sink is not None:
+        sink.close()
+    sink = new_sink or None
+    return sink
+
 def log_stuff(message:str):
-    print(f'Logging {datetime.now()}  :  {message}')
\ No newline at end of file
+    if sink is not None:
+        sink.write(message)
+        return
+    print(f'Logging {datetime.now()}  :  {message}')
+
+def log_many(messages:list):
+    """Same as log_stuff, but for a batch of messages: one timestamp and one single write"""
+    if sink is not None:
+        for message in messages:
+            sink.write(message)
+        return
+    now = datetime.now()
+    print('\n'.join(f'Logging {now}  :  {message}' for message in messages))
@@ -0,0 +1,85 @@
+# Logging through the standard library, with the formatting and the I/O moved off
+# the request thread: the loggers only put the records in a queue (QueueHandler),
+# and a QueueListener thread formats and writes them with the real handlers.
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = 'observer'
+FORMAT = 'Logging %(asctime)s  :  %(message)s'
+
+_listener = None
+
+# Settings of the logging module changed by lean_records, and their previous values
+_RECORD_OPTIONS = ('_srcfile', 'logThreads', 'logProcesses', 'logMultiprocessing')
+_saved_options = None
+
+
+class _CheapQueueHandler(QueueHandler):
+    """The default QueueHandler formats the message in the caller's thread
+    (prepare). Here the record is queued as it is, and the QueueListener does it"""
+
+    def prepare(self, record):
+        return record
+
+
+def setup_queue_logging(level=logging.INFO, handlers=None, maxsize: int = 0,
+                        lean_records: bool = False) -> QueueListener:
+    """Sets up the queue pipeline for the 'observer' loggers
+
+    Args:
+        level (int): level of the logger. Below it, the calls return without building any message
+        handlers (list): real handlers, run in the listener thread (a stdout StreamHandler by default)
+        maxsize (int): max number of queued records (0 -> unbounded)
+        lean_records (bool): skip the caller/thread/process info of the records, which
+            is the most expensive part of creating them (see the "Optimization" section
+            of the logging HOWTO). It affects the whole logging module, until
+            shutdown_queue_logging puts it back as it was
+    """
+    global _listener, _saved_options
+    shutdown_queue_logging()
+    if lean_records:
+        _saved_options = {name: getattr(logging, name) for name in _RECORD_OPTIONS}
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+    if handlers is None:
+        handlers = [logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(logging.Formatter(FORMAT))
+    records = queue.SimpleQueue() if maxsize <= 0 else queue.Queue(maxsize)
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.propagate = False
+    logger.handlers = [_CheapQueueHandler(records)]
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_queue_logging)
+    return _listener
+
+
+def shutdown_queue_logging() -> None:
+    """Writes the pending records and stops the listener thread"""
+    global _listener, _saved_options
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener = None
+        atexit.unregister(shutdown_queue_logging)
+    if _saved_options is not None:
+        for name, value in _saved_options.items():
+            setattr(logging, name, value)
+        _saved_options = None
+
+
+def queue_logging_running() -> bool:
+    return _listener is not None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
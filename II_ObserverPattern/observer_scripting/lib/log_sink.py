@@ -0,0 +1,142 @@
+# Buffered, non blocking sink for the logs.
+# log_stuff used to format a datetime and print for every single message. With a
+# sink, the caller only appends (time, message) to an in-memory ring buffer, and a
+# background thread formats the lines and writes them in big chunks.
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class CoarseClock:
+    """Formats timestamps, reusing the last string while we are in the same
+    time slot (resolution seconds). Formatting a datetime is not cheap"""
+
+    def __init__(self, resolution: float = 0.001) -> None:
+        self.resolution = resolution
+        self._slot = None
+        self._text = ''
+
+    def format(self, timestamp: float) -> str:
+        slot = int(timestamp / self.resolution)
+        if slot != self._slot:
+            self._slot = slot
+            self._text = str(datetime.fromtimestamp(slot * self.resolution))
+        return self._text
+
+
+class LogSink:
+    """Ring buffer of log messages drained by a writer thread
+
+    Args:
+        target: path of the file to write to, or an open stream (sys.stdout by default)
+        capacity (int): max messages in the buffer. When full the oldest ones are dropped
+            (and counted in .dropped), so logging never blocks the caller
+        max_write_bytes (int): max size of every single write
+        flush_interval (float): max seconds a message waits in the buffer
+        resolution (float): resolution of the timestamps (see CoarseClock)
+    """
+
+    def __init__(self, target=None, capacity: int = 100_000, max_write_bytes: int = 1 << 16,
+                 flush_interval: float = 0.05, resolution: float = 0.001) -> None:
+        if target is None:
+            target = sys.stdout
+        self._owns_stream = isinstance(target, str)
+        self.stream = open(target, 'a', buffering=1 << 16) if self._owns_stream else target
+        self.capacity = capacity
+        self.max_write_bytes = max_write_bytes
+        self.flush_interval = flush_interval
+        self.clock = CoarseClock(resolution)
+        self.dropped = 0
+        self._buffer = deque()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition()
+        self._written = 0   # number of messages written so far
+        self._queued = 0    # number of messages accepted so far
+        self._counts = threading.Lock()  # _queued and dropped, updated from every logging thread
+        self._closed = False
+        self._stopped = False  # the writer thread has finished (closed, or failed)
+        self._writer = threading.Thread(target=self._run, name='log-sink', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def write(self, message: str) -> None:
+        """Queues a message. It never blocks nor does any I/O"""
+        buffer = self._buffer
+        with self._counts:
+            if len(buffer) >= self.capacity:
+                try:
+                    buffer.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    pass
+            buffer.append((time.time(), message))
+            self._queued += 1
+
+    def _run(self) -> None:
+        try:
+            while not self._closed:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._write_pending()
+            self._write_pending()
+        finally:
+            # Also when the stream fails: nobody would wake up the callers of flush otherwise
+            with self._flushed:
+                self._stopped = True
+                self._flushed.notify_all()
+
+    def _write_pending(self) -> None:
+        buffer = self._buffer
+        fmt = self.clock.format
+        chunk = []
+        size = 0
+        count = 0
+        while buffer:
+            try:
+                timestamp, message = buffer.popleft()
+            except IndexError:
+                break
+            line = f'Logging {fmt(timestamp)}  :  {message}\n'
+            chunk.append(line)
+            size += len(line)
+            count += 1
+            if size >= self.max_write_bytes:
+                self.stream.write(''.join(chunk))
+                chunk, size = [], 0
+        if chunk:
+            self.stream.write(''.join(chunk))
+        if count:
+            self.stream.flush()
+        with self._flushed:
+            self._written += count
+            self._flushed.notify_all()
+
+    def flush(self, timeout=None) -> None:
+        """Blocks until every message queued so far has been written (or dropped),
+        or the writer thread has stopped"""
+        with self._counts:
+            target = self._queued - self.dropped
+        self._wake.set()
+        with self._flushed:
+            self._flushed.wait_for(lambda: self._written >= target or self._closed or self._stopped, timeout)
+
+    def close(self) -> None:
+        """Writes what is left and stops the writer. Registered at exit, so no
+        message is lost when the app finishes"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        if self._owns_stream:
+            self.stream.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,235 @@
+# Persistent store of users, backed by SQLite (the local stand in of a real database).
+# It has the same interface as lib.database.UserRepository, so it can be plugged
+# in with lib.database.set_user_store, and create_user/find_user keep working.
+#  - The writes are grouped in transactions of write_batch_size users. The pending ones
+#    are still visible to get/find_by, they are committed before a scan of the whole
+#    table (len, iteration) and on close (at exit too), but a crash loses them.
+#    With write_batch_size=1 every user is committed when it is added
+#  - Connections come from a small pool, so several threads can use the store. Iterating
+#    reads the users in pages, so the connection goes back to the pool between pages
+#  - bulk_add streams any iterable into the table, chunk by chunk
+import atexit
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from .database import User
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    email      TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    password   TEXT NOT NULL,
+    reset_code TEXT NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS users_name ON users (name);
+'''
+
+
+class ConnectionPool:
+    """Keeps up to size open connections to the same database file"""
+
+    def __init__(self, path: str, size: int = 4) -> None:
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # WAL + synchronous NORMAL: crash safe, and a commit does not cost a full fsync
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                yield connection
+            finally:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _to_user(row) -> User:
+    email, name, password, reset_code = row
+    user = User(name, password, email)
+    user.reset_code = reset_code
+    return user
+
+
+class SqliteUserStore:
+    """User store persisted in a SQLite file
+
+    Args:
+        path (str): database file
+        write_batch_size (int): users per write transaction. The users added since the last
+            commit are lost on a crash, even if create_user returned (and posted its event);
+            with 1 every add is committed before it returns, at a fraction of the throughput
+        pool_size (int): max number of open connections
+        page_size (int): users read at a time when iterating
+    """
+
+    def __init__(self, path: str = 'users.db', write_batch_size: int = 100, pool_size: int = 4,
+                 page_size: int = 1_000) -> None:
+        self.write_batch_size = write_batch_size
+        self.page_size = page_size
+        self.pool = ConnectionPool(path, pool_size)
+        self._pending = dict()  # email -> User, waiting for the next commit
+        self._lock = threading.RLock()
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+        atexit.register(self.close)
+
+    def _execute(self, sql: str, parameters=()) -> list:
+        with self.pool.connection() as connection:
+            return connection.execute(sql, parameters).fetchall()
+
+    # --- Writing ---
+    def add(self, user: User) -> User:
+        with self._lock:
+            if user.email in self._pending or self._execute(
+                    'SELECT 1 FROM users WHERE email = ?', (user.email,)):
+                raise Exception(f"User with email {user.email} already exists")
+            self._pending[user.email] = user
+            if len(self._pending) >= self.write_batch_size:
+                self.flush()
+        return user
+
+    def flush(self) -> None:
+        """Commits the pending users in a single transaction. The ones whose email was added
+        meanwhile by someone else (another process) are left out and reported afterwards"""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [(u.email, u.name, u.password, u.reset_code) for u in self._pending.values()]
+            with self.pool.connection() as connection:
+                conflicts = self._insert(connection, rows)
+            self._pending.clear()
+        if conflicts:
+            raise Exception(f"Users with email {', '.join(conflicts)} already exist, they were not added")
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, rows: list) -> list:
+        """Inserts the rows in a transaction, returns the emails that were already there"""
+        connection.execute('BEGIN')
+        try:
+            connection.executemany('INSERT INTO users VALUES (?, ?, ?, ?)', rows)
+        except sqlite3.IntegrityError:
+            # Again, one by one, to keep every row but the repeated ones
+            connection.execute('ROLLBACK')
+            connection.execute('BEGIN')
+            try:
+                conflicts = [row[0] for row in rows
+                             if not connection.execute('INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)', row).rowcount]
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+            return conflicts
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return []
+
+    def bulk_add(self, rows, chunk_size: int = 50_000) -> int:
+        """Inserts (name, password, email) rows from any iterable, one transaction per chunk,
+        without ever holding more than a chunk in memory. Returns the number of users added"""
+        self.flush()
+        count = 0
+        iterator = ((email, name, password) for name, password, email in rows)
+        with self._lock, self.pool.connection() as connection:
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    return count
+                connection.execute('BEGIN')
+                try:
+                    connection.executemany('INSERT INTO users (email, name, password) VALUES (?, ?, ?)', chunk)
+                except sqlite3.IntegrityError as e:
+                    connection.execute('ROLLBACK')
+                    raise Exception(f'Repeated email in the rows {count} to {count + len(chunk)}: {e}') from None
+                connection.execute('COMMIT')
+                count += len(chunk)
+
+    def update(self, user: User) -> None:
+        """Saves the changes made to a user (new password, reset code ...)"""
+        with self._lock:
+            if user.email in self._pending:
+                self._pending[user.email] = user
+                return
+            self._execute('UPDATE users SET name = ?, password = ?, reset_code = ? WHERE email = ?',
+                          (user.name, user.password, user.reset_code, user.email))
+
+    def remove(self, email: str) -> User:
+        with self._lock:
+            user = self.get(email)
+            if self._pending.pop(email, None) is None:
+                self._execute('DELETE FROM users WHERE email = ?', (email,))
+            return user
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._execute('DELETE FROM users')
+
+    def close(self) -> None:
+        """Commits what is pending and closes the connections (registered at exit)"""
+        try:
+            self.flush()
+        finally:
+            self.pool.close()
+            atexit.unregister(self.close)
+
+    # --- Reading ---
+    def get(self, email: str) -> User:
+        user = self._pending.get(email)
+        if user is not None:
+            return user
+        rows = self._execute('SELECT email, name, password, reset_code FROM users WHERE email = ?', (email,))
+        if not rows:
+            raise Exception(f"User with email {email} not found")
+        return _to_user(rows[0])
+
+    def find_by(self, attr: str, value) -> list:
+        if attr not in ('email', 'name'):
+            raise Exception(f"There is no index for the attribute {attr}")
+        pending = [u for u in list(self._pending.values()) if getattr(u, attr) == value]
+        rows = self._execute(f'SELECT email, name, password, reset_code FROM users WHERE {attr} = ?', (value,))
+        return pending + [_to_user(row) for row in rows]
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._execute('SELECT COUNT(*) FROM users')[0][0]
+
+    def __contains__(self, email: str) -> bool:
+        return email in self._pending or bool(self._execute('SELECT 1 FROM users WHERE email = ?', (email,)))
+
+    def __iter__(self):
+        # Pages in email order (the primary key), each one a query of its own: a slow
+        # consumer does not keep a connection of the pool
+        self.flush()
+        rows = self._execute('SELECT email, name, password, reset_code FROM users '
+                             'ORDER BY email LIMIT ?', (self.page_size,))
+        while rows:
+            yield from map(_to_user, rows)
+            if len(rows) < self.page_size:
+                return
+            rows = self._execute('SELECT email, name, password, reset_code FROM users '
+                                 'WHERE email > ? ORDER BY email LIMIT ?', (rows[-1][0], self.page_size))
@@ -0,0 +1,38 @@
+# Start up checks of the app, run with:  python -m pytest test_startup.py
+# The heavy modules must stay deferred until used, and the start up within the
+# budget of benchmark_startup (which prints the details when it fails).
+import json
+
+from api.lazy import LazySubscriber
+from benchmark_startup import DEFERRED, run_python, wall_clock
+
+BUDGET_MS = 40.0
+
+
+def test_heavy_modules_are_deferred():
+    loaded = run_python('import sys, application; print(" ".join(sys.modules))').stdout.split()
+    assert [module for module in DEFERRED if module in loaded] == []
+
+
+def test_subscribing_by_name_imports_nothing():
+    code = ('import sys, application\n'
+            'from api import events\n'
+            'events.subscribe("startup_check", "lib.log:log_stuff")\n'
+            'events.unsubscribe("startup_check", print)\n'
+            'print(" ".join(sys.modules))')
+    loaded = run_python(code).stdout.split()
+    assert [module for module in DEFERRED if module in loaded] == []
+
+
+def test_startup_within_budget():
+    startup_ms = (wall_clock('import application', 7) - wall_clock('pass', 7)) * 1000
+    assert startup_ms <= BUDGET_MS, f'start up of {startup_ms:.1f} ms, budget {BUDGET_MS:.0f} ms'
+
+
+def test_lazy_subscriber_compared_by_name_until_imported():
+    assert LazySubscriber('no_such_module:handler') != print
+    subscriber = LazySubscriber('json:dumps')
+    assert subscriber == json.dumps and subscriber.function is None
+    assert subscriber != json.loads
+    subscriber.resolve()
+    assert subscriber == json.dumps and subscriber != json.loads
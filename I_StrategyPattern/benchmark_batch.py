@@ -0,0 +1,79 @@
+# Throughput of classifying many small lists (1M lists of 100 elements by default):
+#  - one client per list, printing (strategy_pattern_7), as the clients are used in this repo
+#  - the same clients in quiet mode
+#  - classify_many (strategy_pattern_batch), as a generator and packed in a RaggedArray,
+#    in this process and over a pool of workers
+# The printing clients go to /dev/null, over a sample of the lists (it is far too slow otherwise).
+# Launch it from this folder:  python benchmark_batch.py [lists] [size] [workers]
+import contextlib
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from strategy_pattern_7 import List_reader_functional, sortingClassifier_function
+from strategy_pattern_batch import classify_many
+
+DISTINCT = 1000  # the input is made of this many different lists, repeated (it saves RAM)
+
+
+def make_lists(n: int, size: int):
+    rng = random.Random(0)
+    base = [[rng.randrange(1000) for _ in range(size)] for _ in range(DISTINCT)]
+    return (base[i % DISTINCT] for i in range(n))
+
+
+def report(name: str, n: int, elapsed: float, extra: str = '') -> None:
+    print(f'{name:>34} : {n / elapsed:12.0f} lists/s  ({elapsed:7.2f} s for {n} lists){extra}')
+
+
+def main(n: int, size: int, workers: int):
+    strategy = sortingClassifier_function
+    print(f'{n} lists of {size} elements, {os.cpu_count()} cores')
+
+    # Floats must be packed in a float array, not in a list
+    for pool in (None, workers):
+        floats = classify_many(strategy, [[1.5, .5], [2.5]], workers=pool, ragged=True)
+        assert floats.typecode == 'd' and list(floats) == [[.5, 1.5], [2.5]], floats.values
+    # Bools after ints (whose typecode is the hint of the next chunk) stay bools
+    mixed = classify_many(strategy, [[2, 1], [True, False]], chunksize=1, ragged=True)
+    assert list(mixed) == [[1, 2], [False, True]] and type(mixed[1][0]) is bool, mixed.values
+
+    sample = max(n // 100, 1)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for lista in make_lists(sample, size):
+            List_reader_functional(lista, strategy).classify_list()
+        elapsed = time.perf_counter() - start
+    report('client per list, printing', sample, elapsed, ' (sample)')
+
+    start = time.perf_counter()
+    for lista in make_lists(n, size):
+        List_reader_functional(lista, strategy).classify_list(quiet=True)
+    report('client per list, quiet', n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    deque(classify_many(strategy, make_lists(n, size)), maxlen=0)
+    report('classify_many, generator', n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    packed = classify_many(strategy, make_lists(n, size), ragged=True)
+    report('classify_many, ragged', n, time.perf_counter() - start, f' {packed.nbytes / (1 << 20):.0f} MB')
+    del packed
+
+    if workers > 1:
+        start = time.perf_counter()
+        deque(classify_many(strategy, make_lists(n, size), workers=workers), maxlen=0)
+        report(f'classify_many, generator, {workers} workers', n, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        packed = classify_many(strategy, make_lists(n, size), workers=workers, ragged=True)
+        report(f'classify_many, ragged, {workers} workers', n, time.perf_counter() - start)
+        assert packed[-1] == sorted(deque(make_lists(n, size), maxlen=1)[0])
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+         int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1))
@@ -0,0 +1,54 @@
+# Time of a workload of repeated classifications, with and without the memoizing
+# wrapper of strategy_pattern_cache. A fraction (repeat ratio) of the calls is made
+# with an input seen before (the most recent ones are more likely), the rest with new lists.
+# Launch it from this folder:  python benchmark_cache.py [calls] [list_size] [repeat_ratio]
+import random
+import sys
+import time
+
+from strategy_pattern_7 import (RemoveIndicesClassifier, randomClassifier_function_creator,
+                                reversedClassifier_function, sortingClassifier_function)
+from strategy_pattern_cache import ClassifierCache, cached
+
+
+def workload(calls: int, size: int, repeat_ratio: float) -> list:
+    rng = random.Random(0)
+    seen = []
+    inputs = []
+    for _ in range(calls):
+        if seen and rng.random() < repeat_ratio:
+            # Recent inputs are more popular: triangular pick towards the end
+            inputs.append(seen[int(rng.triangular(0, len(seen), len(seen))) % len(seen)])
+        else:
+            seen.append([rng.random() for _ in range(size)])
+            inputs.append(seen[-1])
+    return inputs
+
+
+def run(strategy, inputs: list) -> float:
+    start = time.perf_counter()
+    for lista in inputs:
+        strategy(lista)
+    return time.perf_counter() - start
+
+
+def main(calls: int, size: int, repeat_ratio: float):
+    inputs = workload(calls, size, repeat_ratio)
+    print(f'{calls} calls over lists of {size} elements, repeat ratio {repeat_ratio:.0%}')
+    strategies = (sortingClassifier_function, reversedClassifier_function,
+                  RemoveIndicesClassifier(revome_indices=list(range(0, size, 3))),
+                  randomClassifier_function_creator(seed=2))
+    for strategy in strategies:
+        cache = ClassifierCache(max_entries=64, max_bytes=512 << 20)
+        plain = run(strategy, inputs)
+        memoized = run(cached(strategy, cache=cache), inputs)
+        stats = cache.stats
+        print(f'{strategy.__name__:>30} : {plain * 1000:9.1f} ms | cached {memoized * 1000:9.1f} ms'
+              f' (x{plain / memoized:.2f}) | hits {stats.hit_ratio:.0%}, evictions {stats.evictions},'
+              f' {stats.bytes / (1 << 20):.1f} MB')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 100_000,
+         float(sys.argv[3]) if len(sys.argv) > 3 else 0.8)
@@ -0,0 +1,53 @@
+# Peak memory (RSS) of a pipeline going once through the result:
+# eager classifiers (strategy_pattern_5) vs lazy ones (strategy_pattern_lazy)
+# Every case runs in a fresh process, so the peaks do not mix.
+# Launch it from this folder:  python benchmark_lazy_memory.py [n]
+import multiprocessing
+import resource
+import sys
+
+import strategy_pattern_5 as eager
+import strategy_pattern_6 as eager_functions
+import strategy_pattern_lazy as lazy
+
+
+def strategies(kind: str, n: int) -> list:
+    # Rotation and reversal give sequence views, that the index removal (a generator) can go through
+    remove = list(range(0, n, 10))
+    if kind == 'eager':
+        return [eager.InitialNumberClassifier(initial_index=n // 3),
+                eager_functions.reversedClassifier_function,
+                eager.RemoveIndicesClassifier(revome_indices=remove)]
+    return [lazy.LazyInitialNumberClassifier(initial_index=n // 3),
+            lazy.LazyReversedClassifier(),
+            lazy.LazyRemoveIndicesClassifier(revome_indices=remove)]
+
+
+def run_case(kind: str, n: int, results) -> None:
+    lista = list(range(n))
+    pipeline = strategies(kind, n)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = lista
+    for step in pipeline:
+        result = step(result)
+    total = sum(result)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((kind, total, (peak - baseline) / 1024))  # ru_maxrss is in KB on Linux
+
+
+def main(n: int):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    totals = set()
+    for kind in ('eager', 'lazy'):
+        process = context.Process(target=run_case, args=(kind, n, results))
+        process.start()
+        process.join()
+        kind, total, extra_mb = results.get()
+        totals.add(total)
+        print(f'{kind:>6} : {extra_mb:10.1f} MB over the input list ({n} elements)')
+    assert len(totals) == 1, 'Both pipelines have to give the same result'
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000)
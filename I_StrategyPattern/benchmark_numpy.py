@@ -0,0 +1,52 @@
+# List engine (strategy_pattern_3 / strategy_pattern_6) vs NumPy engine (strategy_pattern_numpy)
+# Needs NumPy (optional for the rest of the folder):  pip install numpy
+# Launch it from this folder:  python benchmark_numpy.py [max_exponent]
+# Sizes go from 1e3 to 10**max_exponent (7 by default; 8 needs several GB for the lists)
+import random
+import sys
+import time
+
+import numpy as np
+
+import strategy_pattern_3 as lists
+import strategy_pattern_6 as functions
+import strategy_pattern_numpy as arrays
+
+LIST_LIMIT = 10**7  # The python lists above this size take too long (and too much memory)
+
+
+def timeit(fn, data, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def engines(n: int):
+    remove = random.sample(range(n), 10)
+    yield 'sort', functions.sortingClassifier_function, arrays.NumpySortingClassifier()
+    yield 'reverse', functions.reversedClassifier_function, arrays.NumpyReversedClassifier()
+    yield 'shuffle', lists.RandomClassifier().classify, arrays.NumpyRandomClassifier(seed=1)
+    yield 'rotate', lists.InitialNumberClassifier(n // 3).classify, arrays.NumpyInitialNumberClassifier(n // 3)
+    yield 'remove 10', lists.RemoveIndicesClassifier(remove).classify, arrays.NumpyRemoveIndicesClassifier(remove)
+
+
+def main(max_exponent: int):
+    print(f'{"strategy":>10} | {"n":>10} | {"list (s)":>10} | {"numpy (s)":>10} | speed up')
+    for exponent in range(3, max_exponent + 1):
+        n = 10**exponent
+        array = np.random.default_rng(0).random(n)
+        lista = array.tolist() if n <= LIST_LIMIT else None
+        for name, list_engine, numpy_engine in engines(n):
+            numpy_time = timeit(numpy_engine, array)
+            if lista is None:
+                print(f'{name:>10} | {n:>10} | {"-":>10} | {numpy_time:10.5f} |')
+                continue
+            list_time = timeit(list_engine, lista)
+            print(f'{name:>10} | {n:>10} | {list_time:10.5f} | {numpy_time:10.5f} | x{list_time / numpy_time:.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 7)
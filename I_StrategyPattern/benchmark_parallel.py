@@ -0,0 +1,63 @@
+# Core scaling of the parallel strategies (strategy_pattern_parallel) against the
+# single core ones, for 1, 2, 4 ... cores. It also checks that the parallel shuffle
+# gives the same list whatever the number of workers.
+# Launch it from this folder:  python benchmark_parallel.py [n]
+import os
+import random
+import sys
+import time
+
+from strategy_pattern_parallel import ParallelRandomClassifier, ParallelSortingClassifier, shutdown_pools
+
+
+def timed(function, lista: list) -> tuple:
+    start = time.perf_counter()
+    result = function(lista)
+    return time.perf_counter() - start, result
+
+
+def worker_counts() -> list:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main(n: int):
+    rng = random.Random(0)
+    floats = [rng.random() for _ in range(n)]
+    ints = [rng.randrange(1 << 40) for _ in range(n)]
+    strings = [str(number) for number in ints[:n // 4]]
+
+    print(f'{n} elements, {os.cpu_count()} cores')
+    for label, lista in (('floats', floats), ('ints', ints), ('strings', strings)):
+        serial, expected = timed(sorted, lista)
+        print(f'sort {label:>8} | serial : {serial * 1000:9.1f} ms')
+        for workers in worker_counts():
+            ParallelSortingClassifier(workers)(lista[:100_000])  # warm up the pool
+            elapsed, result = timed(ParallelSortingClassifier(workers), lista)
+            assert result == expected
+            print(f'sort {label:>8} | {workers:>2} workers : {elapsed * 1000:9.1f} ms  (x{serial / elapsed:.2f})')
+
+    def serial_shuffle(lista):
+        copy = list(lista)
+        random.Random(42).shuffle(copy)
+        return copy
+    serial, _ = timed(serial_shuffle, ints)
+    print(f'shuffle          | serial : {serial * 1000:9.1f} ms')
+    results = []
+    for workers in worker_counts():
+        ParallelRandomClassifier(seed=42, workers=workers)(ints[:100_000])
+        elapsed, result = timed(ParallelRandomClassifier(seed=42, workers=workers), ints)
+        results.append(result)
+        print(f'shuffle          | {workers:>2} workers : {elapsed * 1000:9.1f} ms  (x{serial / elapsed:.2f})')
+    assert all(result == results[0] for result in results), 'The shuffle has to be the same for any number of workers'
+    assert sorted(results[0]) == sorted(ints)
+    shutdown_pools()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,55 @@
+# Naive chains of classifiers (one full copy per step) against the fused Pipeline
+# of strategy_pattern_pipeline, for a few typical chains. Both have to agree.
+# Launch it from this folder:  python benchmark_pipeline.py [n] [repeats]
+import sys
+import time
+
+from strategy_pattern_5 import InitialNumberClassifier
+from strategy_pattern_7 import (RemoveIndicesClassifier, blackHoleClassifier_function,
+                                randomClassifier_function_creator, reversedClassifier_function,
+                                sortingClassifier_function)
+from strategy_pattern_pipeline import Pipeline
+
+
+def naive(steps: list):
+    def chain(lista: list) -> list:
+        for step in steps:
+            lista = step(lista)
+        return lista
+    return chain
+
+
+def best_time(function, lista: list, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(lista)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n: int, repeats: int):
+    lista = list(range(n))
+    chains = {
+        'remove | rotate | reverse': [RemoveIndicesClassifier(revome_indices=list(range(0, n, 1000))),
+                                      InitialNumberClassifier(initial_index=n // 3),
+                                      reversedClassifier_function],
+        'reverse | reverse': [reversedClassifier_function, reversedClassifier_function],
+        'rotate x4': [InitialNumberClassifier(initial_index=n // 5)] * 4,
+        'shuffle | rotate | sort': [randomClassifier_function_creator(seed=1),
+                                    InitialNumberClassifier(initial_index=7), sortingClassifier_function],
+        'sort | ... | black hole': [sortingClassifier_function, reversedClassifier_function,
+                                    blackHoleClassifier_function],
+    }
+    print(f'{n} elements, best of {repeats}')
+    for name, steps in chains.items():
+        chain, fused = naive(steps), Pipeline(*steps)
+        assert chain(lista) == fused(lista)
+        naive_time, fused_time = best_time(chain, lista, repeats), best_time(fused, lista, repeats)
+        print(f'{name:>26} : naive {naive_time * 1000:9.2f} ms | fused {fused_time * 1000:9.2f} ms'
+              f' (x{naive_time / max(fused_time, 1e-9):.1f})')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5)
@@ -0,0 +1,39 @@
+# Scaling of RemoveIndicesClassifier over the list size (n) and the number of removed indices (k)
+# Launch it from this folder:  python benchmark_remove_indices.py
+import random
+import time
+
+from strategy_pattern_5 import RemoveIndicesClassifier
+
+OLD_LIMIT = 10**8  # n*k above which the old version is not even tried
+
+
+def old_remove(lista: list, revome_indices: list) -> list:
+    """The former O(n*k) implementation, for comparison"""
+    return [el for i,el in enumerate(lista) if i not in revome_indices]
+
+
+def timeit(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f'{"n":>9} | {"k":>9} | {"old (s)":>9} | {"new (s)":>9}')
+    for n in (10**4, 10**5, 10**6):
+        lista = list(range(n))
+        for k in sorted({10, 1_000, n // 10, n // 2}):
+            indices = random.sample(range(n), k)
+            classifier = RemoveIndicesClassifier(revome_indices=indices)
+            new = timeit(classifier, lista)
+            if n * k <= OLD_LIMIT:
+                old = timeit(old_remove, lista, indices)
+                assert old_remove(lista, indices) == classifier(lista)
+                print(f'{n:>9} | {k:>9} | {old:9.4f} | {new:9.4f}')
+            else:
+                print(f'{n:>9} | {k:>9} | {"-":>9} | {new:9.4f}')
+
+
+if __name__ == '__main__':
+    main()
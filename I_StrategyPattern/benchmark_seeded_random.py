@@ -0,0 +1,50 @@
+# Throughput of the seeded random classifier of strategy_pattern_7 from several threads,
+# against the old closure that reseeded the global generator of the random module.
+# The results are checked to be deterministic by test_seeded_random.py.
+# Launch it from this folder:  python benchmark_seeded_random.py [calls] [list_size]
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from strategy_pattern_7 import randomClassifier_function_creator
+
+SEED = 2
+
+
+def old_randomClassifier_function_creator(seed):
+    def randomClassifier_function(lista: list) -> list:
+        lista2 = lista.copy()
+        random.seed(seed)
+        random.shuffle(lista2)
+        return lista2
+    return randomClassifier_function
+
+
+def throughput(function, lista: list, calls: int, threads: int) -> float:
+    def work(_):
+        for _ in range(calls // threads):
+            function(lista)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(work, range(threads)))
+    return calls / (time.perf_counter() - start)
+
+
+def main(calls: int, size: int):
+    lista = list(range(size))
+    print(f'{calls} calls over a list of {size} elements')
+    for threads in (1, 2, 4, 8):
+        old = throughput(old_randomClassifier_function_creator(SEED), lista, calls, threads)
+        new = throughput(randomClassifier_function_creator(SEED), lista, calls, threads)
+        print(f'{threads} threads | global reseed : {old:10.0f} calls/s | own generator : {new:10.0f} calls/s'
+              f' (x{new / old:.2f})')
+    new = randomClassifier_function_creator(SEED)
+    start = time.perf_counter()
+    new.batch([lista] * calls)
+    print(f'batch     | {calls / (time.perf_counter() - start):10.0f} calls/s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10)
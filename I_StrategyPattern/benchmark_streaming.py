@@ -0,0 +1,72 @@
+# Throughput and peak memory of the streaming classifiers over a big binary file,
+# with a fixed memory cap. Every strategy runs in a fresh process.
+# Launch it from this folder:  python benchmark_streaming.py [input_size] [memory_cap]
+# Sizes accept K/M/G suffixes, e.g.: python benchmark_streaming.py 10G 256M
+# (the input and the output need twice the input size of free disk)
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from array import array
+
+from strategy_pattern_streaming import (BlackHoleStreamClassifier, InitialNumberStreamClassifier,
+                                        RemoveIndicesStreamClassifier, ReversedStreamClassifier,
+                                        SortingStreamClassifier, Stream_classifier)
+
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    if text[-1].upper() in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1].upper()])
+    return int(text)
+
+
+def write_input(path: str, size: int) -> None:
+    rng = random.Random(0)
+    block = 1 << 20  # numbers per write
+    remaining = size // 8
+    with open(path, 'wb') as f:
+        while remaining:
+            n = min(block, remaining)
+            array('d', (rng.random() for _ in range(n))).tofile(f)
+            remaining -= n
+
+
+def run_case(strategy, source: str, destination: str, memory_cap: int, results) -> None:
+    client = Stream_classifier(source, strategy, memory_cap=memory_cap)
+    start = time.perf_counter()
+    with open(destination, 'wb') as output:
+        strategy(client.source, output, client.chunk_items)
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main(size: int, memory_cap: int):
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'input.bin')
+        destination = os.path.join(directory, 'output.bin')
+        write_input(source, size)
+        n = size // 8
+        strategies = (BlackHoleStreamClassifier(), ReversedStreamClassifier(),
+                      InitialNumberStreamClassifier(initial_index=n // 3),
+                      RemoveIndicesStreamClassifier(revome_indices=range(0, n, 100)),
+                      SortingStreamClassifier(temp_dir=directory))
+        print(f'Input of {size / UNITS["M"]:.0f} MB, memory cap {memory_cap / UNITS["M"]:.0f} MB')
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        for strategy in strategies:
+            process = context.Process(target=run_case, args=(strategy, source, destination, memory_cap, results))
+            process.start()
+            process.join()
+            elapsed, peak_mb = results.get()
+            print(f'{strategy.__class__.__name__:>30} : {size / UNITS["M"] / elapsed:8.1f} MB/s'
+                  f' | peak RSS {peak_mb:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main(parse_size(sys.argv[1]) if len(sys.argv) > 1 else 200 * UNITS['M'],
+         parse_size(sys.argv[2]) if len(sys.argv) > 2 else 32 * UNITS['M'])
@@ -0,0 +1,203 @@
+# Benchmark suite of every variant of the Strategy Pattern in this folder.
+#  - dispatch: time per call over an empty list, i.e. the cost of the style itself
+#    (ABC class built per call, ABC/Protocol instance, __call__ object, function, closure ...)
+#  - variants: time per call of every algorithm of every variant, per size and element type
+#  - engines: the same, list in -> list out, for the engines of strategy_pattern_adaptive,
+#    which uses this section to choose its engine
+# The report is written as JSON (only with --output: strategy_pattern_adaptive reads
+# benchmark_results.json, so writing it changes its choices), and can be compared
+# with an older one to spot regressions.
+# Launch it from this folder:
+#   python benchmark_suite.py [--sizes 10 1000 100000] [--types int float str]
+#                             [--output benchmark_results.json] [--compare old.json]
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import strategy_pattern_adaptive as adaptive
+
+
+def _bind(strategy, method):
+    return getattr(strategy, method) if method else strategy
+
+
+def _consumed(strategy):
+    return lambda lista: list(strategy(lista))
+
+
+def _rotate(cls, method=None):
+    return lambda n: _bind(cls(initial_index=n // 3), method)
+
+
+def _remove(cls, method=None):
+    return lambda n: _bind(cls(revome_indices=list(range(0, n, 10))), method)
+
+
+# For each variant: its style and {algorithm: factory(n) -> callable}
+BUILDERS = {
+    # The client of this variant builds the strategy at every call
+    'strategy_pattern_1': lambda m: ('ABC, class per call', {
+        'random': lambda n: lambda lista: m.RandomClassifier().classify(lista),
+        'reverse': lambda n: lambda lista: m.ReversedClassifier().classify(lista),
+        'sort': lambda n: lambda lista: m.SortingClassifier().classify(lista),
+        'black_hole': lambda n: lambda lista: m.BlackHoleClassifier().classify(lista)}),
+    'strategy_pattern_2': lambda m: ('functions', {
+        'random': lambda n: m.randomClassifier_function, 'reverse': lambda n: m.reversedClassifier_function,
+        'sort': lambda n: m.sortingClassifier_function, 'black_hole': lambda n: m.blackHoleClassifier_function}),
+    'strategy_pattern_3': lambda m: ('ABC instance', {
+        'random': lambda n: m.RandomClassifier().classify,
+        'rotate': _rotate(m.InitialNumberClassifier, 'classify'),
+        'remove': _remove(m.RemoveIndicesClassifier, 'classify')}),
+    'strategy_pattern_4_1': lambda m: ('Protocol instance', {
+        'random': lambda n: m.RandomClassifier().classify,
+        'rotate': _rotate(m.InitialNumberClassifier, 'classify'),
+        'remove': _remove(m.RemoveIndicesClassifier, 'classify')}),
+    'strategy_pattern_4_2': lambda m: ('Protocol instance', {'black_hole': lambda n: m.BlackHoleClassifier().classify}),
+    'strategy_pattern_5': lambda m: ('__call__ object', {
+        'random': lambda n: m.RandomClassifier(),
+        'rotate': _rotate(m.InitialNumberClassifier), 'remove': _remove(m.RemoveIndicesClassifier)}),
+    'strategy_pattern_6': lambda m: ('functions', {
+        'random': lambda n: m.randomClassifier_function, 'reverse': lambda n: m.reversedClassifier_function,
+        'sort': lambda n: m.sortingClassifier_function, 'black_hole': lambda n: m.blackHoleClassifier_function,
+        'remove': _remove(m.RemoveIndicesClassifier)}),
+    'strategy_pattern_7': lambda m: ('functions and closures', {
+        'random': lambda n: m.randomClassifier_function_creator(seed=1),
+        'reverse': lambda n: m.reversedClassifier_function, 'sort': lambda n: m.sortingClassifier_function,
+        'black_hole': lambda n: m.blackHoleClassifier_function, 'remove': _remove(m.RemoveIndicesClassifier)}),
+    # The views are gone through once, as a lazy pipeline would
+    'strategy_pattern_lazy': lambda m: ('lazy views, consumed', {
+        'reverse': lambda n: _consumed(m.LazyReversedClassifier()),
+        'black_hole': lambda n: _consumed(m.LazyBlackHoleClassifier()),
+        'rotate': lambda n: _consumed(m.LazyInitialNumberClassifier(initial_index=n // 3)),
+        'remove': lambda n: _consumed(m.LazyRemoveIndicesClassifier(revome_indices=list(range(0, n, 10))))}),
+    'strategy_pattern_numpy': lambda m: ('NumPy, list input', {
+        'random': lambda n: m.NumpyRandomClassifier(seed=1), 'reverse': lambda n: m.NumpyReversedClassifier(),
+        'sort': lambda n: m.NumpySortingClassifier(), 'black_hole': lambda n: m.NumpyBlackHoleClassifier(),
+        'rotate': _rotate(m.NumpyInitialNumberClassifier), 'remove': _remove(m.NumpyRemoveIndicesClassifier)}),
+}
+
+
+def variants() -> tuple:
+    """{variant: (style, algorithms)} and {variant: reason} for the ones that can not be imported"""
+    table, skipped = {}, {}
+    for name, builder in BUILDERS.items():
+        try:
+            module = importlib.import_module(name)
+        except Exception as error:  # Any error at import time: the variant is reported as skipped
+            skipped[name] = f'{type(error).__name__}: {error}'
+            continue
+        table[name] = builder(module)
+    return table, skipped
+
+
+def make_list(kind: str, n: int) -> list:
+    rng = random.Random(n)
+    numbers = [rng.randrange(1 << 30) for _ in range(n)]
+    if kind == 'float':
+        return [number / (1 << 30) for number in numbers]
+    if kind == 'str':
+        return [str(number) for number in numbers]
+    return numbers
+
+
+def time_per_call(function, lista: list, budget: float = 0.05, repeats: int = 3) -> float:
+    """Best time per call, with enough calls for each repeat to last about budget seconds"""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            function(lista)
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget or calls >= 1 << 20:
+            break
+        calls *= 2 if elapsed == 0 else max(2, min(int(budget / elapsed) + 1, 100))
+    best = elapsed / calls
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function(lista)
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def run(sizes: list, kinds: list) -> dict:
+    table, skipped = variants()
+    report = {'meta': {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                       'python': sys.version.split()[0], 'platform': platform.platform(),
+                       'cpus': os.cpu_count(), 'sizes': sizes, 'types': kinds},
+              'skipped': skipped, 'dispatch': {}, 'variants': {}, 'engines': {}}
+
+    for variant, (style, algorithms) in table.items():
+        report['dispatch'][variant] = {'style': style, 'ns_per_call': {
+            algorithm: time_per_call(factory(0), []) * 1e9 for algorithm, factory in algorithms.items()}}
+        print(f'dispatch {variant:>22} ({style}): ' + ', '.join(
+            f'{algorithm} {ns:.0f} ns' for algorithm, ns in report['dispatch'][variant]['ns_per_call'].items()))
+
+    for kind in kinds:
+        for n in sizes:
+            lista = make_list(kind, n)
+            for variant, (style, algorithms) in table.items():
+                for algorithm, factory in algorithms.items():
+                    seconds = time_per_call(factory(n), lista)
+                    report['variants'].setdefault(variant, {}).setdefault(algorithm, {}) \
+                        .setdefault(kind, {})[str(n)] = seconds
+            for algorithm in adaptive.ALGORITHMS:
+                for engine in adaptive.available_engines(algorithm):
+                    strategy = adaptive.ENGINES[engine](algorithm, seed=1, initial_index=n // 3,
+                                                        revome_indices=range(0, n, 10))
+                    seconds = time_per_call(strategy, lista)
+                    report['engines'].setdefault(algorithm, {}).setdefault(kind, {}) \
+                        .setdefault(engine, {})[str(n)] = seconds
+            print(f'{kind:>5} x {n:>9} : ' + ', '.join(
+                f'{algorithm} ' + '/'.join(f'{engine} {times[str(n)] * 1e6:.1f} us'
+                                           for engine, times in report['engines'][algorithm][kind].items())
+                for algorithm in adaptive.ALGORITHMS))
+    for variant, reason in skipped.items():
+        print(f'skipped {variant}: {reason}')
+    return report
+
+
+def compare(old: dict, new: dict, threshold: float = 1.2) -> list:
+    """Cases at least threshold times slower than in the old report"""
+    regressions = []
+    for variant, algorithms in new['variants'].items():
+        for algorithm, kinds in algorithms.items():
+            for kind, times in kinds.items():
+                for n, seconds in times.items():
+                    before = old.get('variants', {}).get(variant, {}).get(algorithm, {}).get(kind, {}).get(n)
+                    if before and seconds / before >= threshold:
+                        regressions.append((variant, algorithm, kind, int(n), seconds / before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite of the Strategy Pattern variants')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1_000, 100_000])
+    parser.add_argument('--types', nargs='+', default=['int', 'float', 'str'], choices=['int', 'float', 'str'])
+    parser.add_argument('--output', help=f'JSON report ({os.path.basename(adaptive.MEASUREMENTS)} '
+                                         f'is read by strategy_pattern_adaptive)')
+    parser.add_argument('--compare', metavar='OLD_JSON', help='report the cases slower than in this older report')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.types)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f'Report written to {args.output}')
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report)
+        for variant, algorithm, kind, n, ratio in regressions:
+            print(f'REGRESSION {variant} {algorithm} {kind} x {n}: x{ratio:.2f} slower')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
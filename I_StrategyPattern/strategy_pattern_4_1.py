@@ -1,6 +1,8 @@
 from typing import Protocol
 from dataclasses import dataclass, field
 import random
+from bisect import bisect_left
+from copy import copy
 
 class I_ListClassifier(Protocol):
     def classify(self,lista:list):
@@ -34,8 +36,21 @@ class InitialNumberClassifier:
 @dataclass
 class RemoveIndicesClassifier:
     revome_indices: list = field(default_factory=list)
+    _indices_of = None
+    def _indices(self) -> list:
+        #revome_indices sorted and deduplicated, sorted again only if the field changed since
+        if self._indices_of != self.revome_indices:
+            self._sorted_indices = sorted({i for i in self.revome_indices if i >= 0})
+            self._indices_of = copy(self.revome_indices)
+        return self._sorted_indices
     def classify(self,lista:list) -> list:
-        lista2 = [el for i,el in enumerate(lista) if i not in self.revome_indices]
+        indices = self._indices()
+        lista2 = []
+        start = 0
+        for i in indices[:bisect_left(indices,len(lista))]:
+            lista2 += lista[start:i]
+            start = i + 1
+        lista2 += lista[start:]
         return lista2
 
     def print_init(self,lista:list) -> None:
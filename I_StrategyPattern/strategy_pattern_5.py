@@ -1,6 +1,8 @@
 from typing import Protocol
 from dataclasses import dataclass, field
 import random
+from bisect import bisect_left
+from copy import copy
 #Using protocols, but making use of the __call__ to avoind problems with the typing 
 # somewhere else down the line (in other potential sripts)
 
@@ -28,8 +30,21 @@ class InitialNumberClassifier:
 @dataclass
 class RemoveIndicesClassifier:
     revome_indices: list = field(default_factory=list)
+    _indices_of = None
+    def _indices(self) -> list:
+        #revome_indices sorted and deduplicated, sorted again only if the field changed since
+        if self._indices_of != self.revome_indices:
+            self._sorted_indices = sorted({i for i in self.revome_indices if i >= 0})
+            self._indices_of = copy(self.revome_indices)
+        return self._sorted_indices
     def __call__(self,lista:list) -> list:
-        lista2 = [el for i,el in enumerate(lista) if i not in self.revome_indices]
+        indices = self._indices()
+        lista2 = []
+        start = 0
+        for i in indices[:bisect_left(indices,len(lista))]:
+            lista2 += lista[start:i]
+            start = i + 1
+        lista2 += lista[start:]
         return lista2
 
 #We create the client that uses the classification algorithm - And now decoupled from the specifics of each algorithm
@@ -38,11 +53,15 @@ class List_classifier:
         self.lista = lista
         self.strat = strategy
     
-    def classify_list(self):
+    def classify_list(self,quiet:bool = False):
+        #quiet skips the reporting (formatting the lists is O(n)), and only gives the result back
+        if quiet:
+            return self.strat(lista = self.lista)
         print(f'The provided classifier is {self.strat.__class__.__name__}')
         print(f'Given list {self.lista}')
         sorted_list = self.strat(lista = self.lista)
         print(f'Classified list {sorted_list}')
+        return sorted_list
 
 
 if __name__ == '__main__':
@@ -1,6 +1,8 @@
 import random
 from typing import Callable
 from dataclasses import dataclass, field
+from bisect import bisect_left
+from copy import copy
 
 # Functional approach to the Strategy Pattern - Part II -> 
 # Creating aliases with Callable
@@ -32,12 +34,25 @@ def sortingClassifier_function(lista:list) -> list:
 @dataclass
 class RemoveIndicesClassifier:
     revome_indices: list = field(default_factory=list)
+    _indices_of = None
     def __post_init__(self):
         """The post_init method ensures the creating of the __name__ variable,
         as it is a requirement by the Client side of things"""
         self.__name__ = 'RemoveIndicicesClassifier'
+    def _indices(self) -> list:
+        #revome_indices sorted and deduplicated, sorted again only if the field changed since
+        if self._indices_of != self.revome_indices:
+            self._sorted_indices = sorted({i for i in self.revome_indices if i >= 0})
+            self._indices_of = copy(self.revome_indices)
+        return self._sorted_indices
     def __call__(self,lista:list) -> list:
-        lista2 = [el for i,el in enumerate(lista) if i not in self.revome_indices]
+        indices = self._indices()
+        lista2 = []
+        start = 0
+        for i in indices[:bisect_left(indices,len(lista))]:
+            lista2 += lista[start:i]
+            start = i + 1
+        lista2 += lista[start:]
         return lista2
 
 
@@ -49,11 +64,15 @@ class List_reader_functional:
         self.lista = lista
         self.strategy = strategy
     
-    def classify_list(self):
+    def classify_list(self,quiet:bool = False):
+        #quiet skips the reporting (formatting the lists is O(n)), and only gives the result back
+        if quiet:
+            return self.strategy(self.lista)
         print(f'The provided classifier is {self.strategy.__name__}')
         print(f'Given list {self.lista}')
         sorted_list = self.strategy(self.lista)
         print(f'Classified list {sorted_list}')
+        return sorted_list
 
 
 if __name__ == '__main__':
@@ -1,6 +1,11 @@
 import random
+import threading
 from typing import Callable,Optional
 from dataclasses import dataclass, field
+from bisect import bisect_left
+from copy import copy
+from functools import lru_cache
+from operator import itemgetter
 
 # Functional approach to the Strategy Pattern - Part III -> 
 # Creating aliases with Callable
@@ -22,13 +27,56 @@ def blackHoleClassifier_function(lista : list) -> list:
     return []
 
 #Now, the random method will be defined by a closure, so 
-#we can add the seed for the classifier
+#we can add the seed for the classifier.
+#The closure owns its generators (one per thread) instead of reseeding the global
+#one of the random module, which was slow and broke the randomness of other threads.
+#With a seed, every call starts again from the seeded state, so it gives the same
+#shuffle as random.seed(seed) + random.shuffle did. That shuffle only depends on the
+#length of the list, so the permutation is computed once per length and reused.
+#Only for the short lists: a cached permutation takes as much memory as the list,
+#so the long ones are shuffled again every time (same result, a bit slower)
+CACHED_PERMUTATION_MAX = 1 << 14
+
 def randomClassifier_function_creator(seed: Optional[int]) -> I_ListClassifier:
+    local = threading.local()
+    initial_state = random.Random(seed).getstate() if seed is not None else None
+
+    def generator() -> random.Random:
+        rng = getattr(local, 'rng', None)
+        if rng is None:
+            rng = local.rng = random.Random(seed)
+        if initial_state is not None:
+            rng.setstate(initial_state)
+        return rng
+
+    @lru_cache(maxsize=16)
+    def permutation(n: int) -> Callable:
+        if n < 2:
+            return tuple  # nothing to shuffle (and itemgetter needs 2 indices to give a tuple)
+        order = list(range(n))
+        generator().shuffle(order)
+        return itemgetter(*order)
+
     def randomClassifier_function(lista : list) -> list:
+        if seed is not None and len(lista) <= CACHED_PERMUTATION_MAX:
+            return list(permutation(len(lista))(lista))
         lista2 = lista.copy()
-        random.seed(seed)
-        random.shuffle(lista2)
+        generator().shuffle(lista2)
         return lista2
+
+    def batch(listas : list) -> list:
+        """Shuffles several lists with a single stream: the generator is set once and
+        list k gets the k-th shuffle of it, so the batch is reproducible as a whole"""
+        rng = generator()
+        result = []
+        for lista in listas:
+            lista2 = lista.copy()
+            rng.shuffle(lista2)
+            result.append(lista2)
+        return result
+
+    randomClassifier_function.seed = seed
+    randomClassifier_function.batch = batch
     return randomClassifier_function
 
 def sortingClassifier_function(lista:list) -> list:
@@ -43,12 +91,25 @@ def sortingClassifier_function(lista:list) -> list:
 @dataclass
 class RemoveIndicesClassifier:
     revome_indices: list = field(default_factory=list)
+    _indices_of = None
     def __post_init__(self):
         """The post_init method ensures the creating of the __name__ variable,
         as it is a requirement by the Client side of things"""
         self.__name__ = 'RemoveIndicicesClassifier'
+    def _indices(self) -> list:
+        #revome_indices sorted and deduplicated, sorted again only if the field changed since
+        if self._indices_of != self.revome_indices:
+            self._sorted_indices = sorted({i for i in self.revome_indices if i >= 0})
+            self._indices_of = copy(self.revome_indices)
+        return self._sorted_indices
     def __call__(self,lista:list) -> list:
-        lista2 = [el for i,el in enumerate(lista) if i not in self.revome_indices]
+        indices = self._indices()
+        lista2 = []
+        start = 0
+        for i in indices[:bisect_left(indices,len(lista))]:
+            lista2 += lista[start:i]
+            start = i + 1
+        lista2 += lista[start:]
         return lista2
 
 
@@ -60,11 +121,15 @@ class List_reader_functional:
         self.lista = lista
         self.strategy = strategy
     
-    def classify_list(self):
+    def classify_list(self,quiet:bool = False):
+        #quiet skips the reporting (formatting the lists is O(n)), and only gives the result back
+        if quiet:
+            return self.strategy(self.lista)
         print(f'The provided classifier is {self.strategy.__name__}')
         print(f'Given list {self.lista}')
         sorted_list = self.strategy(self.lista)
         print(f'Classified list {sorted_list}')
+        return sorted_list
 
 
 if __name__ == '__main__':
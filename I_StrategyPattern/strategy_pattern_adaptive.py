@@ -0,0 +1,178 @@
+import json
+import math
+import os
+from typing import Callable, Optional
+
+import strategy_pattern_5
+import strategy_pattern_7
+
+# Adaptive approach to the Strategy Pattern.
+# The same classification can be done by several engines: the plain python
+# classifiers (strategy_pattern_5 / 7), the NumPy ones (strategy_pattern_numpy)
+# and the process pool ones (strategy_pattern_parallel). Which one is the fastest
+# depends on the size and the kind of the list, so AdaptiveClassifier chooses it
+# at runtime, from the measurements written by benchmark_suite.py (or from a few
+# rules of thumb if there are none). Every engine takes a list and gives a list.
+# Note that each engine shuffles in its own way: a seeded random classification
+# is reproducible for a given engine, not across engines. Apart from that, the
+# engine never changes the output: NumPy only gets the lists it gives back as they
+# came (all floats, or all ints that fit in int64).
+
+I_ListClassifier = Callable[[list],list]
+
+ALGORITHMS = ('random', 'reverse', 'sort', 'black_hole', 'rotate', 'remove')
+MEASUREMENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results.json')
+
+
+def _python_engine(algorithm: str, seed=None, initial_index=5, revome_indices=()) -> I_ListClassifier:
+    return {'random': lambda: strategy_pattern_7.randomClassifier_function_creator(seed),
+            'reverse': lambda: strategy_pattern_7.reversedClassifier_function,
+            'sort': lambda: strategy_pattern_7.sortingClassifier_function,
+            'black_hole': lambda: strategy_pattern_7.blackHoleClassifier_function,
+            'rotate': lambda: strategy_pattern_5.InitialNumberClassifier(initial_index=initial_index),
+            'remove': lambda: strategy_pattern_7.RemoveIndicesClassifier(revome_indices=list(revome_indices)),
+            }[algorithm]()
+
+
+def _numpy_engine(algorithm: str, seed=None, initial_index=5, revome_indices=()) -> I_ListClassifier:
+    import strategy_pattern_numpy as numpy_strategies
+    strategy = {'random': lambda: numpy_strategies.NumpyRandomClassifier(seed),
+                'reverse': numpy_strategies.NumpyReversedClassifier,
+                'sort': numpy_strategies.NumpySortingClassifier,
+                'black_hole': numpy_strategies.NumpyBlackHoleClassifier,
+                'rotate': lambda: numpy_strategies.NumpyInitialNumberClassifier(initial_index=initial_index),
+                'remove': lambda: numpy_strategies.NumpyRemoveIndicesClassifier(revome_indices=list(revome_indices)),
+                }[algorithm]()
+    return lambda lista: strategy(lista).tolist()
+
+
+def _parallel_engine(algorithm: str, seed=None, **_) -> I_ListClassifier:
+    import strategy_pattern_parallel
+    if algorithm == 'sort':
+        return strategy_pattern_parallel.ParallelSortingClassifier()
+    if algorithm == 'random':
+        return strategy_pattern_parallel.ParallelRandomClassifier(seed=seed)
+    raise ValueError(f'No parallel engine for {algorithm}')
+
+
+ENGINES = {'python': _python_engine, 'numpy': _numpy_engine, 'parallel': _parallel_engine}
+
+
+def available_engines(algorithm: str) -> list:
+    """Engines that can run the algorithm in this environment"""
+    engines = ['python']
+    try:
+        import numpy  # noqa: F401
+        engines.append('numpy')
+    except ImportError:
+        pass
+    if algorithm in ('sort', 'random') and (os.cpu_count() or 1) > 1:
+        engines.append('parallel')
+    return engines
+
+
+def element_kind(lista: list) -> str:
+    """'int', 'float' or 'str' (by the first element), 'other' otherwise"""
+    if not lista:
+        return 'int'
+    kind = type(lista[0]).__name__
+    return kind if kind in ('int', 'float', 'str') else 'other'
+
+
+def numpy_safe(lista: list) -> bool:
+    """True if a NumPy array gives back the same values: every element is a float,
+    or every one is an int that fits in int64 (a mixed list would be converted
+    to a single type: ints to floats, numbers to strings ...)"""
+    kinds = set(map(type, lista))
+    if kinds == {float}:
+        return True
+    if kinds == {int}:
+        return -(1 << 63) <= min(lista) and max(lista) < (1 << 63)
+    return not kinds
+
+
+def load_measurements(path: str = MEASUREMENTS) -> dict:
+    """The 'engines' section of a benchmark_suite.py report, {} if there is none"""
+    try:
+        with open(path) as f:
+            return json.load(f).get('engines', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def default_engine(algorithm: str, kind: str, size: int, engines: list) -> str:
+    """Rules of thumb, when there are no measurements"""
+    numeric = kind in ('int', 'float')
+    if 'parallel' in engines and algorithm == 'sort' and size >= 2_000_000:
+        return 'parallel'
+    if 'numpy' in engines and numeric and size >= 10_000 and algorithm in ('sort', 'random', 'remove'):
+        return 'numpy'
+    return 'python'
+
+
+class AdaptiveClassifier:
+    """Any of the ALGORITHMS, run by the fastest engine for each list"""
+    def __init__(self, algorithm: str, seed: Optional[int] = None, initial_index: int = 5,
+                 revome_indices: list = (), measurements: Optional[dict] = None) -> None:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f'Unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}')
+        self.algorithm = algorithm
+        self.params = dict(seed=seed, initial_index=initial_index, revome_indices=revome_indices)
+        self.measurements = (load_measurements() if measurements is None else measurements).get(algorithm, {})
+        self.engines = available_engines(algorithm)
+        self.__name__ = f'AdaptiveClassifier({algorithm})'
+        self._strategies = {}
+        self._choices = {}  # (kind, size bucket) -> engine
+
+    def choose_engine(self, lista: list) -> str:
+        kind = element_kind(lista)
+        bucket = int(math.log2(len(lista) + 1))
+        key = (kind, bucket)
+        if key not in self._choices:
+            self._choices[key] = self._best_measured(kind, len(lista)) or \
+                default_engine(self.algorithm, kind, len(lista), self.engines)
+        engine = self._choices[key]
+        # The kind comes from the first element: the whole list is checked before going to NumPy
+        if engine == 'numpy' and not numpy_safe(lista):
+            return 'python'
+        return engine
+
+    def _best_measured(self, kind: str, size: int) -> Optional[str]:
+        """Fastest available engine at the measured size closest to size (in log scale)"""
+        by_engine = {engine: times for engine, times in self.measurements.get(kind, {}).items()
+                     if engine in self.engines and times}
+        if not by_engine:
+            return None
+        sizes = {int(s) for times in by_engine.values() for s in times}
+        closest = min(sizes, key=lambda s: abs(math.log((s + 1) / (size + 1))))
+        timed = {engine: times[str(closest)] for engine, times in by_engine.items() if str(closest) in times}
+        return min(timed, key=timed.get) if timed else None
+
+    def strategy(self, engine: str) -> I_ListClassifier:
+        if engine not in self._strategies:
+            self._strategies[engine] = ENGINES[engine](self.algorithm, **self.params)
+        return self._strategies[engine]
+
+    def __call__(self, lista: list) -> list:
+        return self.strategy(self.choose_engine(lista))(lista)
+
+
+#The client, that also tells which engine was chosen
+class List_classifier:
+    def __init__(self,lista:list,strategy:AdaptiveClassifier) -> None:
+        self.lista = lista
+        self.strat = strategy
+
+    def classify_list(self):
+        print(f'The provided classifier is {self.strat.__name__} -> {self.strat.choose_engine(self.lista)} engine')
+        print(f'Given list {self.lista}')
+        sorted_list = self.strat(self.lista)
+        print(f'Classified list {sorted_list}')
+
+
+if __name__ == '__main__':
+    lista = [1,4,7,0,12,5,43]
+    for strategy in (AdaptiveClassifier('sort'), AdaptiveClassifier('random', seed=2),
+                     AdaptiveClassifier('rotate', initial_index=2),
+                     AdaptiveClassifier('remove', revome_indices=[0,1,4])):
+        List_classifier(lista,strategy).classify_list()
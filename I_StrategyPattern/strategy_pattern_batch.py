@@ -0,0 +1,200 @@
+import multiprocessing
+import pickle
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain, islice
+from typing import Callable, Iterable, Iterator, Optional
+
+# Batch approach to the Strategy Pattern.
+# The clients of strategy_pattern_5 / 6 / 7 classify one list at a time, and print
+# it. To classify a million small lists, classify_many applies one strategy to all
+# of them in a single call, with no reporting at all, optionally spread over a pool
+# of processes. The results come as a generator (one list at a time, in order) or
+# packed in a RaggedArray (every value in one flat array, plus the offsets).
+
+I_ListClassifier = Callable[[list],list]
+
+INT_TYPECODES = ('b', 'h', 'i', 'q')  # smallest first
+
+
+def compact(values: list, hint: Optional[str] = None):
+    """The values in the smallest array that holds them, or the list itself if they are not all ints/floats
+    (by exact type: bools and other int subclasses stay in the list, as they are).
+    With the int typecode of the previous values as hint, it is tried first, skipping the min/max scan"""
+    kinds = set(map(type, values))
+    if kinds == {float}:
+        return array('d', values)
+    if kinds == {int}:
+        if hint in INT_TYPECODES:
+            try:
+                return array(hint, values)
+            except OverflowError:
+                pass
+        low, high = min(values), max(values)
+        for typecode in INT_TYPECODES:
+            bits = array(typecode).itemsize * 8 - 1
+            if -(1 << bits) <= low and high < (1 << bits):
+                return array(typecode, values)
+    if not kinds:
+        return array('b')
+    return values
+
+
+def _join(first, second):
+    """first + second, keeping the most compact storage that holds both"""
+    if not len(first):
+        return second[:]  # the storage of second as is: floats stay in a 'd' array
+    if not len(second):
+        return first
+    if isinstance(first, array) and isinstance(second, array):
+        if first.typecode == second.typecode:
+            first.extend(second)
+            return first
+        if first.typecode in INT_TYPECODES and second.typecode in INT_TYPECODES:
+            widest = max(first.typecode, second.typecode, key=INT_TYPECODES.index)
+            joined = array(widest, first)
+            joined.extend(array(widest, second))
+            return joined
+    joined = first.tolist() if isinstance(first, array) else first
+    joined.extend(second)
+    return joined
+
+
+class RaggedArray:
+    """Many lists of different lengths in two flat arrays: list i is values[offsets[i]:offsets[i+1]]"""
+    def __init__(self, values=None, offsets: array = None) -> None:
+        self.values = values if values is not None else array('b')
+        self.offsets = offsets if offsets is not None else array('q', [0])
+
+    @classmethod
+    def from_lists(cls, listas: list, hint: Optional[str] = None) -> 'RaggedArray':
+        return cls(compact(list(chain.from_iterable(listas)), hint),
+                   array('q', accumulate(map(len, listas), initial=0)))
+
+    @property
+    def typecode(self) -> Optional[str]:
+        """Typecode of the values, None if they are kept in a list"""
+        return self.values.typecode if isinstance(self.values, array) and len(self.values) else None
+
+    def extend(self, other: 'RaggedArray') -> None:
+        shift = self.offsets[-1]
+        self.offsets.extend(offset + shift for offset in other.offsets[1:])
+        self.values = _join(self.values, other.values)
+
+    @property
+    def nbytes(self) -> int:
+        if isinstance(self.values, array):
+            values = self.values.itemsize * len(self.values)
+        else:
+            values = sys.getsizeof(self.values) + sum(map(sys.getsizeof, self.values))
+        return values + self.offsets.itemsize * len(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> list:
+        if not -len(self) <= i < len(self):
+            raise IndexError('RaggedArray index out of range')
+        i %= len(self)
+        chunk = self.values[self.offsets[i]:self.offsets[i + 1]]
+        return chunk.tolist() if isinstance(chunk, array) else chunk
+
+    def __iter__(self) -> Iterator[list]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def chunked(listas: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(listas)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# Worker side: the strategy is given once, when the worker starts, not with every chunk
+_strategy = None
+
+def _set_strategy(strategy: I_ListClassifier) -> None:
+    global _strategy
+    _strategy = strategy
+
+def _classify_chunk(chunk: list, ragged: bool):
+    results = [_strategy(lista) for lista in chunk]
+    return RaggedArray.from_lists(results) if ragged else results
+
+
+def _pool(strategy: I_ListClassifier, workers: int) -> ProcessPoolExecutor:
+    try:
+        pickle.dumps(strategy)
+        context = None
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # Closures (strategy_pattern_7) can not be pickled: forked workers inherit them instead
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise TypeError(f'{strategy!r} can not be sent to the workers: use a module level '
+                            f'function or a class instance, or workers=None')
+        context = multiprocessing.get_context('fork')
+    return ProcessPoolExecutor(workers, mp_context=context, initializer=_set_strategy, initargs=(strategy,))
+
+
+def _parallel_chunks(strategy: I_ListClassifier, listas: Iterable, workers: int, chunksize: int,
+                     ragged: bool) -> Iterator:
+    """Results chunk by chunk, in order, with a bounded number of chunks in flight"""
+    with _pool(strategy, workers) as pool:
+        pending = deque()
+        for chunk in chunked(listas, chunksize):
+            pending.append(pool.submit(_classify_chunk, chunk, ragged))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def classify_many(strategy: I_ListClassifier, listas: Iterable, workers: Optional[int] = None,
+                  chunksize: int = 10_000, ragged: bool = False):
+    """Applies strategy to every list of listas (any iterable, it is read as it goes).
+    workers > 1 spreads the lists over a pool of processes, in chunks of chunksize lists.
+    Gives a generator of the results, in order, or a RaggedArray with all of them if ragged"""
+    if not workers or workers <= 1:
+        if not ragged:
+            return map(strategy, listas)
+        result = RaggedArray()
+        for chunk in chunked(listas, chunksize):
+            result.extend(RaggedArray.from_lists([strategy(lista) for lista in chunk], result.typecode))
+        return result
+    chunks = _parallel_chunks(strategy, listas, workers, chunksize, ragged)
+    if not ragged:
+        return (result for chunk in chunks for result in chunk)
+    result = RaggedArray()
+    for chunk in chunks:
+        result.extend(chunk)
+    return result
+
+
+#The client, for many lists at once
+class List_batch_classifier:
+    def __init__(self,listas:Iterable,strategy:I_ListClassifier,workers:Optional[int] = None) -> None:
+        self.listas = listas
+        self.strategy = strategy
+        self.workers = workers
+
+    def classify_lists(self,quiet:bool = True,ragged:bool = False):
+        results = classify_many(self.strategy,self.listas,workers=self.workers,ragged=ragged)
+        if quiet:
+            return results
+        print(f'The provided classifier is {getattr(self.strategy, "__name__", self.strategy.__class__.__name__)}')
+        results = list(results)
+        for n, sorted_list in enumerate(results):
+            print(f'Classified list {n}: {sorted_list}')
+        return results
+
+
+if __name__ == '__main__':
+    from strategy_pattern_7 import RemoveIndicesClassifier, randomClassifier_function_creator, sortingClassifier_function
+    listas = [[1,4,7,0,12,5,43], [3,2,1], [], [2.5,1.5]]
+    List_batch_classifier(listas,sortingClassifier_function).classify_lists(quiet=False)
+    List_batch_classifier(listas,randomClassifier_function_creator(seed=2),workers=2).classify_lists(quiet=False)
+    packed = List_batch_classifier(listas,RemoveIndicesClassifier(revome_indices=[0]),workers=2).classify_lists(ragged=True)
+    print(f'Packed in {packed.nbytes} bytes: {list(packed)}')
+    packed = List_batch_classifier([[2.5,1.5], [0.5]],sortingClassifier_function).classify_lists(ragged=True)
+    print(f'Floats packed in an array of typecode {packed.typecode!r}: {list(packed)}')
@@ -0,0 +1,200 @@
+import hashlib
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Callable, Optional
+
+from strategy_pattern_7 import randomClassifier_function_creator
+
+# Memoizing wrapper for the Callable strategies (strategy_pattern_5 / 6 / 7 ...).
+# Deterministic strategies are often called again and again over the same big
+# lists: the result is kept in a bounded LRU cache, keyed by a content hash of
+# the input plus the strategy: the class and fields of a dataclass strategy
+# (initial_index, revome_indices ...), the seed of the strategy_pattern_7 random
+# closure, and the strategy object itself for any other callable.
+# Non deterministic strategies (a random one without seed) are never cached.
+# Hashing the input is O(n) too: it only pays off for strategies slower than that
+# (sorting, shuffling ...), not for a plain copy or reversal.
+
+I_ListClassifier = Callable[[list],list]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bypasses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def fingerprint(lista: list) -> Optional[bytes]:
+    """128 bits content hash of the list, None if its elements can not be serialized"""
+    try:
+        data = pickle.dumps(lista, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def result_size(lista: list, samples: int = 64) -> int:
+    """Approximate memory of a list and its elements, in bytes
+    (the size of the elements is estimated from a few evenly spaced ones)"""
+    if not lista:
+        return sys.getsizeof(lista)
+    step = max(len(lista) // samples, 1)
+    sample = lista[::step]
+    return sys.getsizeof(lista) + sum(map(sys.getsizeof, sample)) * len(lista) // len(sample)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, range)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+# Code shared by every closure of strategy_pattern_7.randomClassifier_function_creator
+_SEEDED_RANDOM_CODE = randomClassifier_function_creator(None).__code__
+
+
+class _Identity:
+    """Key of a strategy by identity. It holds the strategy, so its id can not be
+    reused by another one while the key is in the cache"""
+    __slots__ = ('strategy',)
+
+    def __init__(self, strategy: I_ListClassifier) -> None:
+        self.strategy = strategy
+
+    def __hash__(self) -> int:
+        return id(self.strategy)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Identity) and other.strategy is self.strategy
+
+
+def strategy_key(strategy: I_ListClassifier):
+    """Identity of the strategy and the values of its parameters. Only the parameters
+    of known strategies are looked at (dataclasses and the seeded random closure):
+    closures, lambdas, partials ... of the same name may do different things,
+    so they are keyed by the object itself"""
+    if is_dataclass(strategy) and not isinstance(strategy, type):
+        kind = type(strategy)
+        params = tuple((f.name, _freeze(getattr(strategy, f.name))) for f in fields(strategy))
+        return (kind.__module__, kind.__qualname__, params)
+    if getattr(strategy, '__code__', None) is _SEEDED_RANDOM_CODE:
+        return (strategy.__module__, strategy.__qualname__, (('seed', strategy.seed),))
+    return _Identity(strategy)
+
+
+def is_deterministic(strategy: I_ListClassifier) -> bool:
+    """Same input, same output? A 'deterministic' attribute has the last word.
+    Otherwise, strategies with a seed are deterministic only if the seed is set,
+    and random strategies without one never are"""
+    if hasattr(strategy, 'deterministic'):
+        return bool(strategy.deterministic)
+    if hasattr(strategy, 'seed'):
+        return strategy.seed is not None
+    name = getattr(strategy, '__name__', type(strategy).__name__)
+    return 'random' not in name.lower() and 'random' not in type(strategy).__name__.lower()
+
+
+class ClassifierCache:
+    """LRU cache of results, bounded by number of entries and by total bytes.
+    It can be shared by several CachedClassifier"""
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 << 20) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def put(self, key, result: list) -> None:
+        size = result_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.stats.bytes -= old[1]
+            self._entries[key] = (result, size)
+            self.stats.bytes += size
+            while len(self._entries) > self.max_entries or self.stats.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.stats.bytes -= evicted_size
+                self.stats.evictions += 1
+            self.stats.entries = len(self._entries)
+
+    def bypass(self) -> None:
+        with self._lock:
+            self.stats.bypasses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.entries = self.stats.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedClassifier:
+    """Wraps any I_ListClassifier. The caller always gets its own copy of the result,
+    so modifying it does not change the cached one"""
+    def __init__(self, strategy: I_ListClassifier, cache: ClassifierCache = None) -> None:
+        self.strategy = strategy
+        self.cache = cache if cache is not None else ClassifierCache()
+        self.__name__ = f'Cached{getattr(strategy, "__name__", type(strategy).__name__)}'
+        self._key = strategy_key(strategy)
+        self._deterministic = is_deterministic(strategy)
+
+    def __call__(self, lista: list) -> list:
+        digest = fingerprint(lista) if self._deterministic else None
+        if digest is None:
+            self.cache.bypass()
+            return self.strategy(lista)
+        key = (self._key, digest)
+        result = self.cache.get(key)
+        if result is None:
+            result = list(self.strategy(lista))
+            self.cache.put(key, result)
+        return result.copy()
+
+
+def cached(strategy: I_ListClassifier = None, *, cache: ClassifierCache = None):
+    """cached(strategy) or, as a decorator, @cached / @cached(cache=shared_cache)"""
+    if strategy is None:
+        return lambda function: CachedClassifier(function, cache)
+    return CachedClassifier(strategy, cache)
+
+
+if __name__ == '__main__':
+    from strategy_pattern_7 import (List_reader_functional, RemoveIndicesClassifier,
+                                    randomClassifier_function_creator, sortingClassifier_function)
+    lista = [1,4,7,0,12,5,43]
+    cache = ClassifierCache(max_entries=8)
+    for strategy in (sortingClassifier_function, RemoveIndicesClassifier(revome_indices=[0,1,4]),
+                     randomClassifier_function_creator(seed=2), randomClassifier_function_creator(seed=None)):
+        reader = List_reader_functional(lista,strategy=cached(strategy,cache=cache))
+        reader.classify_list()
+        reader.classify_list()
+    print(cache.stats)
@@ -0,0 +1,131 @@
+from typing import Iterable, Protocol, Sequence
+from dataclasses import dataclass, field
+from itertools import chain
+from bisect import bisect_left
+from copy import copy
+
+# Lazy approach to the Strategy Pattern.
+# The classifiers of strategy_pattern_5 always build a full copy of the list, even
+# when the caller only goes through the result once. Here the strategies return
+# sequence views or iterators over the original list instead, so a pipeline over
+# a huge input only needs constant extra memory.
+# (Sorting and shuffling can not be lazy: they need to see every element first)
+
+class I_ListClassifier(Protocol):
+    def __call__(self,lista:Sequence) -> Iterable:
+        ...
+
+
+class ReversedView:
+    """Read only view of a sequence, backwards. Indexing and len are O(1)"""
+    __slots__ = ('_lista',)
+
+    def __init__(self, lista: Sequence) -> None:
+        self._lista = lista
+
+    def __len__(self) -> int:
+        return len(self._lista)
+
+    def __getitem__(self, i: int):
+        n = len(self._lista)
+        if not -n <= i < n:
+            raise IndexError('ReversedView index out of range')
+        return self._lista[-1 - i] if i >= 0 else self._lista[-n - 1 - i]
+
+    def __iter__(self):
+        return reversed(self._lista)
+
+    def __repr__(self) -> str:
+        return f'ReversedView({list(self)})'
+
+
+class RotatedView:
+    """Read only view of lista[start:] + lista[:start]. Indexing and len are O(1)"""
+    __slots__ = ('_lista', '_start')
+
+    def __init__(self, lista: Sequence, start: int) -> None:
+        self._lista = lista
+        # Same clamping as the slices of the eager version
+        self._start = min(max(start if start >= 0 else len(lista) + start, 0), len(lista))
+
+    def __len__(self) -> int:
+        return len(self._lista)
+
+    def __getitem__(self, i: int):
+        n = len(self._lista)
+        if not -n <= i < n:
+            raise IndexError('RotatedView index out of range')
+        return self._lista[(i % n + self._start) % n]
+
+    def __iter__(self):
+        n = len(self._lista)
+        return map(self._lista.__getitem__, chain(range(self._start, n), range(self._start)))
+
+    def __repr__(self) -> str:
+        return f'RotatedView({list(self)})'
+
+
+class LazyReversedClassifier:
+    def __call__(self,lista:Sequence) -> ReversedView:
+        return ReversedView(lista)
+
+class LazyBlackHoleClassifier:
+    def __call__(self,lista:Sequence) -> Iterable:
+        return iter(())
+
+@dataclass
+class LazyInitialNumberClassifier:
+    initial_index: int = 5
+    def __call__(self,lista:Sequence) -> RotatedView:
+        return RotatedView(lista,self.initial_index)
+
+@dataclass
+class LazyRemoveIndicesClassifier:
+    revome_indices: list = field(default_factory=list)
+    _indices_of = None
+    def _indices(self) -> list:
+        #revome_indices sorted and deduplicated, sorted again only if the field changed since
+        if self._indices_of != self.revome_indices:
+            self._sorted_indices = sorted({i for i in self.revome_indices if i >= 0})
+            self._indices_of = copy(self.revome_indices)
+        return self._sorted_indices
+    def __call__(self,lista:Sequence) -> Iterable:
+        return self._filter(lista)
+    def _filter(self,lista:Sequence):
+        """Generator yielding the kept elements, run after run"""
+        indices = self._indices()
+        start = 0
+        for i in indices[:bisect_left(indices,len(lista))]:
+            for j in range(start,i):
+                yield lista[j]
+            start = i + 1
+        for j in range(start,len(lista)):
+            yield lista[j]
+
+
+#The client: it only goes through the result, it never needs a list
+class List_classifier:
+    def __init__(self,lista:Sequence,strategy: I_ListClassifier) -> None:
+        self.lista = lista
+        self.strat = strategy
+
+    def classify_list(self):
+        print(f'The provided classifier is {self.strat.__class__.__name__}')
+        print(f'Given list {self.lista}')
+        sorted_list = self.strat(self.lista)
+        print(f'Classified list {" ".join(str(el) for el in sorted_list)}')
+
+
+if __name__ == '__main__':
+    lista = [1,4,7,0,12,5,43]
+    reader = List_classifier(lista,LazyInitialNumberClassifier(initial_index=2))
+    reader.classify_list()
+
+    reader = List_classifier(lista,LazyReversedClassifier())
+    reader.classify_list()
+
+    reader = List_classifier(lista,LazyRemoveIndicesClassifier(revome_indices=[0,1,4]))
+    reader.classify_list()
+
+    reader = List_classifier(lista,LazyBlackHoleClassifier())
+    reader.classify_list()
@@ -0,0 +1,97 @@
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError('strategy_pattern_numpy needs NumPy, an optional dependency: pip install numpy') from None
+from dataclasses import dataclass, field
+from typing import Optional
+
+from strategy_pattern_3 import I_ListClassifier, List_classifier
+
+# NumPy engine for the classifiers of strategy_pattern_3 / strategy_pattern_5.
+# Each strategy works over numeric arrays (lists are converted once), and does the
+# job with a single vectorized operation instead of a python level loop.
+# They are I_ListClassifier subclasses (classify) and also callables (__call__),
+# so both the client of strategy_pattern_3 and the one of strategy_pattern_5 can use them.
+# Whenever the semantics allow it, the result is a view of the input (no copy at all):
+# do not modify it in place if the input has to stay untouched.
+# NumPy is an optional dependency: nothing else in this folder needs it, and
+# strategy_pattern_adaptive / benchmark_suite.py just leave this engine out without it.
+
+
+def as_array(lista) -> np.ndarray:
+    """No copy if it is already an array"""
+    return np.asarray(lista)
+
+
+class NumpyRandomClassifier(I_ListClassifier):
+    # With a seed, every call starts from a fresh generator: the same list length always
+    # gives the same shuffle, as with the seeded classifier of strategy_pattern_7
+    def __init__(self, seed: Optional[int] = None) -> None:
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def classify(self, lista) -> np.ndarray:
+        rng = self.rng if self.seed is None else np.random.default_rng(self.seed)
+        return rng.permutation(as_array(lista))
+    __call__ = classify
+
+
+class NumpyReversedClassifier(I_ListClassifier):
+    def classify(self, lista) -> np.ndarray:
+        return as_array(lista)[::-1]  # A view, O(1)
+    __call__ = classify
+
+
+class NumpySortingClassifier(I_ListClassifier):
+    def classify(self, lista) -> np.ndarray:
+        return np.sort(as_array(lista))
+    __call__ = classify
+
+
+class NumpyBlackHoleClassifier(I_ListClassifier):
+    def classify(self, lista) -> np.ndarray:
+        return as_array(lista)[:0]  # Empty view, keeps the dtype
+    __call__ = classify
+
+
+@dataclass
+class NumpyInitialNumberClassifier(I_ListClassifier):
+    initial_index: int = 5
+    def classify(self, lista) -> np.ndarray:
+        array = as_array(lista)
+        # Same semantics as the list version: lista[i:] + lista[:i]
+        head, tail = array[self.initial_index:], array[:self.initial_index]
+        if not tail.size:
+            return head  # Nothing to rotate -> a view
+        if not head.size:
+            return tail
+        # A rotation can not be a single strided view, so this is the only copy
+        return np.concatenate((head, tail))
+    __call__ = classify
+
+
+@dataclass
+class NumpyRemoveIndicesClassifier(I_ListClassifier):
+    revome_indices: list = field(default_factory=list)
+    def __post_init__(self):
+        # Only the non negative ones, as the list version never matches the negative ones
+        indices = np.asarray(self.revome_indices, dtype=np.intp)
+        self._indices = np.unique(indices[indices >= 0])
+
+    def classify(self, lista) -> np.ndarray:
+        array = as_array(lista)
+        indices = self._indices[self._indices < array.shape[0]]
+        if not indices.size:
+            return array
+        keep = np.ones(array.shape[0], dtype=bool)
+        keep[indices] = False
+        return array[keep]
+    __call__ = classify
+
+
+if __name__ == '__main__':
+    lista = np.array([1,4,7,0,12,5,43])
+    for strategy in (NumpyInitialNumberClassifier(initial_index=2), NumpyRandomClassifier(seed=2),
+                     NumpyReversedClassifier(), NumpySortingClassifier(), NumpyBlackHoleClassifier(),
+                     NumpyRemoveIndicesClassifier(revome_indices=[0,1,4])):
+        List_classifier(lista,strategy).classify_list()
@@ -0,0 +1,148 @@
+import atexit
+import heapq
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+# Parallel (multi core) strategies, following the Callable protocol of
+# strategy_pattern_6 / strategy_pattern_7, so any of their clients can use them.
+#  - Sorting: the list is split in chunks, sorted by a process pool, and the
+#    sorted chunks are merged (k-way) in the parent. Numeric lists travel through
+#    shared memory instead of being pickled.
+#  - Shuffling: "scatter and shuffle". Every block of the input sends each element
+#    to a random bucket, then every bucket is shuffled. Blocks and buckets depend
+#    on the size of the list only, and each one has its own generator derived from
+#    the seed, so the result is the same whatever the number of workers.
+
+I_ListClassifier = Callable[[list],list]
+
+MIN_PARALLEL = 50_000   # Below this size, the pool costs more than it saves
+BLOCK_SIZE = 1 << 16    # Elements per block/bucket of the parallel shuffle
+
+_pools = dict()
+
+def _get_pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+def shutdown_pools():
+    while _pools:
+        _pools.popitem()[1].shutdown()
+
+atexit.register(shutdown_pools)
+
+
+def _chunk_bounds(n: int, n_chunks: int) -> list:
+    step = -(-n // n_chunks)
+    return [(start, min(start + step, n)) for start in range(0, n, step)]
+
+
+def _numeric_typecode(lista: list) -> Optional[str]:
+    """'q' for a list of ints that fit in 64 bits, 'd' for a list of floats, None otherwise"""
+    kinds = set(map(type, lista))
+    if kinds == {float}:
+        return 'd'
+    if kinds == {int} and -(1 << 63) <= min(lista) and max(lista) < (1 << 63):
+        return 'q'
+    return None
+
+
+def _sort_shared(name: str, typecode: str, start: int, stop: int) -> None:
+    """Worker side: sorts in place a slice of the shared buffer"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf.cast(typecode)
+        view[start:stop] = array(typecode, sorted(view[start:stop]))
+        view.release()
+    finally:
+        shm.close()
+
+
+@dataclass
+class ParallelSortingClassifier:
+    workers: Optional[int] = None  # None -> as many as cores
+    def __post_init__(self):
+        self.__name__ = 'ParallelSortingClassifier'
+
+    def __call__(self,lista:list) -> list:
+        if len(lista) < MIN_PARALLEL:
+            return sorted(lista)
+        pool = _get_pool(self.workers)
+        bounds = _chunk_bounds(len(lista), self.workers or os.cpu_count() or 1)
+        typecode = _numeric_typecode(lista)
+        if typecode is None:
+            # Any other kind of elements: the chunks are pickled to the workers
+            runs = list(pool.map(sorted, (lista[start:stop] for start, stop in bounds)))
+            return list(heapq.merge(*runs))
+        data = array(typecode, lista)
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data) * data.itemsize, 1))
+        try:
+            view = shm.buf.cast(typecode)
+            view[:] = data
+            del data
+            futures = [pool.submit(_sort_shared, shm.name, typecode, start, stop) for start, stop in bounds]
+            for future in futures:
+                future.result()
+            result = list(heapq.merge(*(view[start:stop] for start, stop in bounds)))
+            view.release()
+            return result
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+def _scatter(seed, block: int, items: list, n_buckets: int) -> list:
+    """Worker side: sends every element of a block to a random bucket"""
+    rng = random.Random(f'{seed}:scatter:{block}')
+    buckets = [[] for _ in range(n_buckets)]
+    randbelow = rng.randrange
+    for item in items:
+        buckets[randbelow(n_buckets)].append(item)
+    return buckets
+
+def _shuffle_bucket(seed, bucket: int, parts: list) -> list:
+    """Worker side: joins the parts of a bucket and shuffles them"""
+    items = [item for part in parts for item in part]
+    random.Random(f'{seed}:shuffle:{bucket}').shuffle(items)
+    return items
+
+
+@dataclass
+class ParallelRandomClassifier:
+    seed: Optional[int] = None     # None -> a different shuffle every call
+    workers: Optional[int] = None  # It does not change the result, only the speed
+    def __post_init__(self):
+        self.__name__ = 'ParallelRandomClassifier'
+
+    def __call__(self,lista:list) -> list:
+        seed = self.seed if self.seed is not None else random.getrandbits(64)
+        n_blocks = max(-(-len(lista) // BLOCK_SIZE), 1)
+        bounds = _chunk_bounds(len(lista), n_blocks) or [(0, 0)]
+        if len(lista) < MIN_PARALLEL:
+            # Same algorithm in this process (same result as with the pool)
+            scattered = [_scatter(seed, b, lista[start:stop], n_blocks) for b, (start, stop) in enumerate(bounds)]
+            shuffled = [_shuffle_bucket(seed, j, [blocks[j] for blocks in scattered]) for j in range(n_blocks)]
+        else:
+            pool = _get_pool(self.workers)
+            scattered = list(pool.map(_scatter, [seed] * n_blocks, range(n_blocks),
+                                      (lista[start:stop] for start, stop in bounds), [n_blocks] * n_blocks))
+            shuffled = pool.map(_shuffle_bucket, [seed] * n_blocks, range(n_blocks),
+                                ([blocks[j] for blocks in scattered] for j in range(n_blocks)))
+        result = []
+        for bucket in shuffled:
+            result += bucket
+        return result
+
+
+if __name__ == '__main__':
+    from strategy_pattern_7 import List_reader_functional
+    lista = [1,4,7,0,12,5,43]
+    List_reader_functional(lista,strategy=ParallelSortingClassifier()).classify_list()
+    List_reader_functional(lista,strategy=ParallelRandomClassifier(seed=2)).classify_list()
+    List_reader_functional(lista,strategy=ParallelRandomClassifier(seed=2,workers=1)).classify_list()
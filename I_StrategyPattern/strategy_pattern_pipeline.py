@@ -0,0 +1,163 @@
+import random
+from bisect import bisect_left
+from typing import Callable
+
+import strategy_pattern_5
+import strategy_pattern_6
+import strategy_pattern_7
+
+# Pipelines of strategies, with fusion of the steps.
+# Chaining the classifiers of strategy_pattern_5 / 6 / 7 copies the whole list at
+# every step. Pipeline(step1, step2 ...) is a single I_ListClassifier that knows
+# what the usual steps do, and fuses them:
+#  - Index steps (reversal, rotation, index removal) only move positions around,
+#    so they are composed as a list of ranges over the input, and the output is
+#    built once at the end (reverse + reverse is just a copy)
+#  - Sorting and shuffling work in place over the list the pipeline already owns
+#    (a seeded shuffle gives its new list straight away)
+#  - A black hole makes every step before it useless, so they are skipped
+# Any other callable is run as it is (an opaque step).
+
+I_ListClassifier = Callable[[list],list]
+
+REVERSE_STEPS = (strategy_pattern_6.reversedClassifier_function, strategy_pattern_7.reversedClassifier_function)
+BLACK_HOLE_STEPS = (strategy_pattern_6.blackHoleClassifier_function, strategy_pattern_7.blackHoleClassifier_function)
+SORT_STEPS = (strategy_pattern_6.sortingClassifier_function, strategy_pattern_7.sortingClassifier_function)
+SHUFFLE_STEPS = (strategy_pattern_6.randomClassifier_function,)
+SHUFFLE_TYPES = (strategy_pattern_5.RandomClassifier,)
+ROTATE_TYPES = (strategy_pattern_5.InitialNumberClassifier,)
+REMOVE_TYPES = (strategy_pattern_5.RemoveIndicesClassifier, strategy_pattern_6.RemoveIndicesClassifier,
+                strategy_pattern_7.RemoveIndicesClassifier)
+
+
+def compile_step(step: I_ListClassifier) -> list:
+    """The operations (kind, argument) a step is made of"""
+    if isinstance(step, Pipeline):
+        return list(step.operations)
+    if step in REVERSE_STEPS:
+        return [('reverse', None)]
+    if step in BLACK_HOLE_STEPS:
+        return [('black_hole', None)]
+    if step in SORT_STEPS:
+        return [('sort', None)]
+    if step in SHUFFLE_STEPS or isinstance(step, SHUFFLE_TYPES):
+        return [('shuffle', None)]
+    if getattr(step, '__qualname__', '') == 'randomClassifier_function_creator.<locals>.randomClassifier_function':
+        # Seeded closure of strategy_pattern_7: it applies a cached permutation into a new list
+        return [('permute', step) if step.seed is not None else ('shuffle', None)]
+    if isinstance(step, ROTATE_TYPES):
+        return [('rotate', step)]
+    if isinstance(step, REMOVE_TYPES):
+        return [('remove', step)]
+    return [('opaque', step)]
+
+
+def rotate(segments: list, start: int) -> list:
+    """segments of lista[start:] + lista[:start], clamped as the slices are"""
+    n = sum(map(len, segments))
+    start = min(max(start if start >= 0 else n + start, 0), n)
+    head, tail = [], []
+    offset = 0
+    for segment in segments:
+        cut = min(max(start - offset, 0), len(segment))
+        if cut:
+            tail.append(segment[:cut])
+        if cut < len(segment):
+            head.append(segment[cut:])
+        offset += len(segment)
+    return head + tail
+
+
+def remove(segments: list, indices: list) -> list:
+    """segments without the given (sorted) positions"""
+    result = []
+    offset = 0
+    k = 0
+    for segment in segments:
+        end = offset + len(segment)
+        last = bisect_left(indices, end, k)
+        start = 0
+        for i in indices[k:last]:
+            if i - offset > start:
+                result.append(segment[start:i - offset])
+            start = i - offset + 1
+        if start < len(segment):
+            result.append(segment[start:])
+        k = last
+        offset = end
+    return result
+
+
+def materialize(source: list, segments: list) -> list:
+    """The only allocation of the output: one slice copy per segment"""
+    result = []
+    for segment in segments:
+        if segment.step == 1:
+            result += source[segment.start:segment.stop]
+        else:
+            result += source[segment.start:segment.stop if segment.stop >= 0 else None:segment.step]
+    return result
+
+
+class Pipeline:
+    def __init__(self, *steps: I_ListClassifier) -> None:
+        self.steps = steps
+        self.operations = [operation for step in steps for operation in compile_step(step)]
+        self.__name__ = ' | '.join(getattr(step, '__name__', step.__class__.__name__) for step in steps)
+
+    def __call__(self, lista: list) -> list:
+        operations = self.operations
+        kinds = [kind for kind, _ in operations]
+        if 'black_hole' in kinds:
+            # Short circuit: only the steps after the last black hole matter
+            operations = operations[len(kinds) - kinds[::-1].index('black_hole'):]
+            lista = []
+        source = lista
+        owned = False    # is source a list made by the pipeline itself?
+        segments = None  # pending index steps over source (None -> source as it is)
+        for kind, argument in operations:
+            if kind in ('sort', 'shuffle') or (kind == 'reverse' and owned and segments is None):
+                if segments is not None or not owned:
+                    source = materialize(source, segments) if segments is not None else source.copy()
+                    owned, segments = True, None
+                if kind == 'sort':
+                    source.sort()
+                elif kind == 'reverse':
+                    source.reverse()
+                else:
+                    random.shuffle(source)
+            elif kind == 'permute':
+                if segments is not None:
+                    source, segments = materialize(source, segments), None
+                source = argument(source)
+                owned = True
+            elif kind == 'opaque':
+                if segments is not None:
+                    source, segments = materialize(source, segments), None
+                source = argument(source)
+                owned = False
+            else:
+                if segments is None:
+                    segments = [range(len(source))]
+                if kind == 'reverse':
+                    segments = [segment[::-1] for segment in reversed(segments)]
+                elif kind == 'rotate':
+                    segments = rotate(segments, argument.initial_index)
+                elif kind == 'remove':
+                    segments = remove(segments, argument._indices())
+        if segments is not None:
+            return materialize(source, segments)
+        return source if owned else list(source)
+
+
+if __name__ == '__main__':
+    from strategy_pattern_7 import List_reader_functional
+    lista = [1,4,7,0,12,5,43]
+    pipelines = [Pipeline(strategy_pattern_7.RemoveIndicesClassifier(revome_indices=[0,1,4]),
+                          strategy_pattern_5.InitialNumberClassifier(initial_index=2),
+                          strategy_pattern_7.reversedClassifier_function),
+                 Pipeline(strategy_pattern_7.reversedClassifier_function, strategy_pattern_7.reversedClassifier_function),
+                 Pipeline(strategy_pattern_7.sortingClassifier_function, strategy_pattern_7.reversedClassifier_function),
+                 Pipeline(strategy_pattern_7.sortingClassifier_function, strategy_pattern_7.blackHoleClassifier_function)]
+    for pipeline in pipelines:
+        List_reader_functional(lista,strategy=pipeline).classify_list()
@@ -0,0 +1,209 @@
+import heapq
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from copy import copy
+from dataclasses import dataclass, field
+from typing import Protocol
+
+# Streaming approach to the Strategy Pattern.
+# The input is a binary file of numbers (as written by array.tofile), possibly
+# much bigger than the RAM. It is read chunk by chunk (chunk_items numbers at a
+# time, which is the memory cap) and the result is written as it is produced.
+#  - Black hole, index removal, rotation and reversal go through the file once
+#  - Sorting is an external merge sort: sorted runs are spilled to temporary
+#    files and then merged (k-way, at most fan_in runs at a time) into the output
+
+# Bytes per number sorted in python: a list slot, the number object (float or int)
+# and the merge space of list.sort
+SORTED_ITEM_BYTES = 44
+
+class NumberFile:
+    """Binary file of fixed size numbers (typecode as in the array module: 'd', 'q' ...)"""
+    def __init__(self, path: str, typecode: str = 'd') -> None:
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = array(typecode).itemsize
+        self.size = os.path.getsize(path) // self.itemsize
+
+    def chunks(self, chunk_items: int, start: int = 0, stop: int = None):
+        """Yields arrays of (at most) chunk_items numbers, from start to stop"""
+        stop = self.size if stop is None else min(stop, self.size)
+        with open(self.path, 'rb', buffering=0) as f:  # whole chunks at once, no read buffer
+            f.seek(start * self.itemsize)
+            position = start
+            while position < stop:
+                n = min(chunk_items, stop - position)
+                position += n
+                yield self._read_array(f, n)  # not kept here while the next one is read
+
+    def chunks_backwards(self, chunk_items: int):
+        """Yields the chunks from the end of the file to its beginning (each one reversed)"""
+        with open(self.path, 'rb', buffering=0) as f:  # whole chunks at once, no read buffer
+            stop = self.size
+            while stop > 0:
+                start = max(stop - chunk_items, 0)
+                f.seek(start * self.itemsize)
+                chunk = self._read_array(f, stop - start)
+                chunk.reverse()
+                stop = start
+                yield chunk
+                del chunk
+
+    def _read_array(self, f, n: int) -> array:
+        """The next n numbers of f, read straight into the array (array.fromfile goes
+        through a temporary bytes object, twice the memory of the chunk)"""
+        chunk = array(self.typecode, [0]) * n
+        with memoryview(chunk) as items, items.cast('B') as view:
+            filled = 0
+            while filled < len(view):
+                read = f.readinto(view[filled:])
+                if not read:
+                    raise EOFError("read() didn't return enough bytes")
+                filled += read
+        return chunk
+
+
+class I_StreamClassifier(Protocol):
+    def __call__(self,source:NumberFile,output,chunk_items:int) -> None:
+        ...
+
+
+class BlackHoleStreamClassifier:
+    def __call__(self,source:NumberFile,output,chunk_items:int) -> None:
+        pass
+
+class ReversedStreamClassifier:
+    def __call__(self,source:NumberFile,output,chunk_items:int) -> None:
+        for chunk in source.chunks_backwards(chunk_items):
+            chunk.tofile(output)
+
+@dataclass
+class InitialNumberStreamClassifier:
+    initial_index: int = 5
+    def __call__(self,source:NumberFile,output,chunk_items:int) -> None:
+        # lista[i:] + lista[:i], with the same clamping of the slices
+        i = self.initial_index if self.initial_index >= 0 else source.size + self.initial_index
+        i = min(max(i, 0), source.size)
+        for chunk in source.chunks(chunk_items, start=i):
+            chunk.tofile(output)
+        for chunk in source.chunks(chunk_items, stop=i):
+            chunk.tofile(output)
+
+@dataclass
+class RemoveIndicesStreamClassifier:
+    revome_indices: list = field(default_factory=list)
+    _indices_of = None
+    def _indices(self) -> list:
+        #revome_indices sorted and deduplicated, sorted again only if the field changed since
+        if self._indices_of != self.revome_indices:
+            self._sorted_indices = sorted({i for i in self.revome_indices if i >= 0})
+            self._indices_of = copy(self.revome_indices)
+        return self._sorted_indices
+    def __call__(self,source:NumberFile,output,chunk_items:int) -> None:
+        indices = self._indices()
+        offset = 0
+        k = 0  # first index not handled yet
+        for chunk in source.chunks(chunk_items):
+            end = offset + len(chunk)
+            last = bisect_left(indices, end, k)
+            start = 0
+            for i in indices[k:last]:
+                chunk[start:i - offset].tofile(output)
+                start = i - offset + 1
+            chunk[start:].tofile(output)
+            k = last
+            offset = end
+
+@dataclass
+class SortingStreamClassifier:
+    temp_dir: str = None  # where the sorted runs are spilled (system default if None)
+    fan_in: int = 64      # max runs merged at once (each one is an open file and a read buffer)
+    def __post_init__(self):
+        if self.fan_in < 2:
+            raise ValueError(f'fan_in must be at least 2, got {self.fan_in}')
+    def __call__(self,source:NumberFile,output,chunk_items:int) -> None:
+        with tempfile.TemporaryDirectory(dir=self.temp_dir) as directory:
+            runs = []
+            # Sorting a run holds the run, the list of python numbers sorted() gives and the
+            # sorted array at once, so the runs are smaller than the chunks to stay within the cap
+            run_items = max(chunk_items * source.itemsize // (2 * source.itemsize + SORTED_ITEM_BYTES), 1)
+            for n, chunk in enumerate(source.chunks(run_items)):
+                path = os.path.join(directory, f'run_{n}.bin')
+                with open(path, 'wb') as f:
+                    array(source.typecode, sorted(chunk)).tofile(f)
+                runs.append(NumberFile(path, source.typecode))
+            if not runs:
+                return
+            # Too many runs to merge them at once: groups of fan_in runs are merged into
+            # longer runs, as many passes as needed
+            merge_pass = 0
+            while len(runs) > self.fan_in:
+                merged_runs = []
+                for g in range(0, len(runs), self.fan_in):
+                    group = runs[g:g + self.fan_in]
+                    if len(group) == 1:
+                        merged_runs.append(group[0])
+                        continue
+                    path = os.path.join(directory, f'merge_{merge_pass}_{len(merged_runs)}.bin')
+                    with open(path, 'wb') as f:
+                        self._merge(group, f, source.typecode, chunk_items)
+                    for run in group:
+                        os.remove(run.path)
+                    merged_runs.append(NumberFile(path, source.typecode))
+                runs = merged_runs
+                merge_pass += 1
+            self._merge(runs, output, source.typecode, chunk_items)
+
+    @classmethod
+    def _merge(cls, runs: list, output, typecode: str, chunk_items: int) -> None:
+        # The memory cap is shared by the read buffers of every run and the write buffer
+        buffer_items = max(chunk_items // (len(runs) + 1), 1)
+        merged = heapq.merge(*(cls._read(run, buffer_items) for run in runs))
+        out = array(typecode)
+        for number in merged:
+            out.append(number)
+            if len(out) >= buffer_items:
+                out.tofile(output)
+                out = array(typecode)
+        out.tofile(output)
+
+    @staticmethod
+    def _read(run: NumberFile, buffer_items: int):
+        for chunk in run.chunks(buffer_items):
+            yield from chunk
+            del chunk  # not kept while the next one is read
+
+
+#The client, working from file to file
+class Stream_classifier:
+    def __init__(self,source:str,strategy:I_StreamClassifier,typecode:str = 'd',
+                 memory_cap:int = 64 << 20) -> None:
+        self.source = NumberFile(source,typecode)
+        self.strat = strategy
+        self.chunk_items = max(memory_cap // self.source.itemsize, 1)
+
+    def classify_file(self,destination:str):
+        print(f'The provided classifier is {self.strat.__class__.__name__}')
+        print(f'Given file {self.source.path} ({self.source.size} numbers)')
+        with open(destination,'wb') as output:
+            self.strat(self.source,output,self.chunk_items)
+        print(f'Classified file {destination} ({os.path.getsize(destination) // self.source.itemsize} numbers)')
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory,'input.bin')
+        destination = os.path.join(directory,'output.bin')
+        with open(source,'wb') as f:
+            array('d',[1,4,7,0,12,5,43]).tofile(f)
+        for strategy in (InitialNumberStreamClassifier(initial_index=2), ReversedStreamClassifier(),
+                         SortingStreamClassifier(), BlackHoleStreamClassifier(),
+                         RemoveIndicesStreamClassifier(revome_indices=[0,1,4])):
+            #A tiny memory cap (3 numbers), so every strategy goes through several chunks
+            Stream_classifier(source,strategy,memory_cap=24).classify_file(destination)
+            result = array('d')
+            with open(destination,'rb') as f:
+                result.frombytes(f.read())
+            print(f'Classified list {result.tolist()}')
@@ -0,0 +1,69 @@
+# Determinism of the seeded random classifier of strategy_pattern_7, on both of its
+# paths: cached permutations (up to CACHED_PERMUTATION_MAX elements) and shuffles
+# with the reset generator (longer lists).
+# Run it from this folder:  python -m unittest test_seeded_random  (or python -m pytest)
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_seeded_random import old_randomClassifier_function_creator
+from strategy_pattern_7 import CACHED_PERMUTATION_MAX, randomClassifier_function_creator
+
+SIZES = (10, CACHED_PERMUTATION_MAX, CACHED_PERMUTATION_MAX + 1)
+
+
+class SeededRandomTest(unittest.TestCase):
+    def test_same_seed_same_shuffle(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                lista = list(range(size))
+                classifier = randomClassifier_function_creator(2)
+                first = classifier(lista)
+                self.assertEqual(first, classifier(lista))
+                self.assertEqual(first, randomClassifier_function_creator(2)(lista))
+                self.assertEqual(sorted(first), lista)
+                self.assertNotEqual(first, lista)
+
+    def test_different_seeds_different_shuffles(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                lista = list(range(size))
+                shuffles = {tuple(randomClassifier_function_creator(seed)(lista)) for seed in range(5)}
+                self.assertEqual(len(shuffles), 5)
+
+    def test_same_shuffle_as_the_global_reseed(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                lista = list(range(size))
+                self.assertEqual(randomClassifier_function_creator(2)(lista),
+                                 old_randomClassifier_function_creator(2)(lista))
+
+    def test_same_shuffle_from_every_thread(self):
+        for size in SIZES:
+            with self.subTest(size=size):
+                lista = list(range(size))
+                classifier = randomClassifier_function_creator(2)
+                expected = classifier(lista)
+                with ThreadPoolExecutor(4) as pool:
+                    results = list(pool.map(lambda _: [classifier(lista) for _ in range(5)], range(4)))
+                self.assertTrue(all(result == expected for thread in results for result in thread))
+
+    def test_batches(self):
+        lista = list(range(10))
+        classifier = randomClassifier_function_creator(2)
+        state = random.getstate()
+        batch = classifier.batch([lista] * 5)
+        self.assertEqual(random.getstate(), state, 'the global generator is not touched')
+        self.assertEqual(batch, classifier.batch([lista] * 5))
+        self.assertEqual(batch[0], classifier(lista))
+        self.assertNotEqual(batch[1], batch[0], 'a batch goes on with the seeded stream')
+
+    def test_unseeded(self):
+        lista = list(range(100))
+        classifier = randomClassifier_function_creator(None)
+        self.assertEqual(sorted(classifier(lista)), lista)
+        self.assertNotEqual(classifier(lista), classifier(lista))
+
+
+if __name__ == '__main__':
+    unittest.main()